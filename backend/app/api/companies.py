@@ -1,43 +1,85 @@
 """API endpoints for company management"""
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 from typing import List, Optional
 from app.core.database import get_db
+from app.core import cache
+from app.api.integrations import contacts_cache_key, enrichment_cache_key
+from app.api.pagination import decode_cursor_key, set_next_cursor, set_total_estimate
 from app.models.lead import Company
 from app.schemas.lead import CompanyCreate, CompanyResponse
 
 router = APIRouter()
 
+# List queries fetch only what the list schema serializes
+LIST_COLUMNS = [getattr(Company, name) for name in CompanyResponse.model_fields]
+
 
 @router.get("/", response_model=List[CompanyResponse])
 async def get_companies(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page; replaces skip"),
+    include_total: bool = Query(False, description="Return the filtered row count in X-Total-Estimate"),
     search: Optional[str] = None,
     city: Optional[str] = None,
     state: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all companies with optional filtering"""
-    query = db.query(Company)
+    """
+    Get all companies with optional filtering
+    Pages by (name, id) keyset via cursor; ranked search results page by skip
+    """
+    stmt = select(Company).options(load_only(*LIST_COLUMNS))
 
-    if search:
-        query = query.filter(Company.name.ilike(f"%{search}%"))
+    order_by = [Company.name]
 
+    # Full-text match on name/description, plus substring match on name for
+    # partial words; Postgres combines both GIN indexes with a BitmapOr
+    if search:
+        ts_query = func.plainto_tsquery('english', search)
+        stmt = stmt.where(or_(
+            Company.tsv.op('@@')(ts_query),
+            func.lower(Company.name).like(f"%{search.lower()}%")
+        ))
+        order_by.insert(0, func.ts_rank(Company.tsv, ts_query).desc())
+
+    # lower(...) LIKE matches the trigram indexes on lower(column)
     if city:
-        query = query.filter(Company.city.ilike(f"%{city}%"))
+        stmt = stmt.where(func.lower(Company.city).like(f"%{city.lower()}%"))
 
     if state:
-        query = query.filter(Company.state.ilike(f"%{state}%"))
+        stmt = stmt.where(func.lower(Company.state).like(f"%{state.lower()}%"))
+
+    if include_total:
+        await set_total_estimate(response, db, stmt)
+
+    # Relevance order has no stable seek key, so only unranked lists use cursors
+    if cursor and search:
+        raise HTTPException(status_code=400, detail="cursor cannot be combined with search")
+
+    if cursor:
+        name, last_id = decode_cursor_key(cursor, str, int)
+        stmt = stmt.where(tuple_(Company.name, Company.id) > (name, last_id))
+    else:
+        stmt = stmt.offset(skip)
+
+    result = await db.execute(stmt.order_by(*order_by, Company.id).limit(limit))
+    companies = result.scalars().all()
+
+    if not search:
+        set_next_cursor(response, companies, limit, lambda company: (company.name, company.id))
 
-    companies = query.order_by(Company.name).offset(skip).limit(limit).all()
     return companies
 
 
 @router.get("/{company_id}", response_model=CompanyResponse)
-async def get_company(company_id: int, db: Session = Depends(get_db)):
+async def get_company(company_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific company by ID"""
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
 
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -45,48 +87,66 @@ async def get_company(company_id: int, db: Session = Depends(get_db)):
     return company
 
 
+async def _check_domain_available(db: AsyncSession, domain: str, company_id: Optional[int] = None):
+    """Reject a domain another company has, ignoring case like the unique index"""
+    stmt = select(Company.id).where(func.lower(Company.domain) == domain.lower())
+    if company_id is not None:
+        stmt = stmt.where(Company.id != company_id)
+
+    if await db.scalar(stmt.limit(1)):
+        raise HTTPException(status_code=400, detail="Company with this domain already exists")
+
+
 @router.post("/", response_model=CompanyResponse, status_code=201)
-async def create_company(company: CompanyCreate, db: Session = Depends(get_db)):
+async def create_company(company: CompanyCreate, db: AsyncSession = Depends(get_db)):
     """Create a new company"""
     # Check if company with same domain already exists
     if company.domain:
-        existing = db.query(Company).filter(Company.domain == company.domain).first()
-        if existing:
-            raise HTTPException(status_code=400, detail="Company with this domain already exists")
+        await _check_domain_available(db, company.domain)
 
     db_company = Company(**company.model_dump())
     db.add(db_company)
-    db.commit()
-    db.refresh(db_company)
+    await db.commit()
+    await db.refresh(db_company)
 
     return db_company
 
 
 @router.patch("/{company_id}", response_model=CompanyResponse)
-async def update_company(company_id: int, company_update: CompanyCreate, db: Session = Depends(get_db)):
+async def update_company(company_id: int, company_update: CompanyCreate, db: AsyncSession = Depends(get_db)):
     """Update a company"""
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
 
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
 
     update_data = company_update.model_dump(exclude_unset=True)
+    if update_data.get('domain'):
+        await _check_domain_available(db, update_data['domain'], company_id)
+
     for field, value in update_data.items():
         setattr(company, field, value)
 
-    db.commit()
-    db.refresh(company)
+    await db.commit()
+    await db.refresh(company)
+
+    # Lead responses embed the company; a changed name or domain also
+    # invalidates earlier enrichment lookups
+    await cache.bump_generation(cache.LEADS)
+    await cache.delete(enrichment_cache_key(company_id), contacts_cache_key(company_id))
 
     return company
 
 
 @router.delete("/{company_id}", status_code=204)
-async def delete_company(company_id: int, db: Session = Depends(get_db)):
+async def delete_company(company_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a company"""
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
 
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
 
-    db.delete(company)
-    db.commit()
+    await db.delete(company)
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
+    await cache.delete(enrichment_cache_key(company_id), contacts_cache_key(company_id))
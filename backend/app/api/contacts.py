@@ -1,35 +1,68 @@
 """API endpoints for contact management"""
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 from typing import List, Optional
 from app.core.database import get_db
+from app.core import cache
+from app.api.pagination import decode_cursor_key, set_next_cursor, set_total_estimate
 from app.models.lead import Contact
-from app.schemas.lead import ContactCreate, ContactResponse
+from app.schemas.lead import ContactCreate, ContactResponse, ContactSummaryResponse
 
 router = APIRouter()
 
+# List queries fetch only what the list schema serializes
+LIST_COLUMNS = [getattr(Contact, name) for name in ContactSummaryResponse.model_fields]
 
-@router.get("/", response_model=List[ContactResponse])
+
+@router.get("/", response_model=List[ContactSummaryResponse])
 async def get_contacts(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page; replaces skip"),
+    include_total: bool = Query(False, description="Return the filtered row count in X-Total-Estimate"),
     company_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all contacts with optional filtering"""
-    query = db.query(Contact)
+    """
+    Get all contacts with optional filtering
+    Pages by (last_name, first_name, id) keyset via cursor
+    """
+    stmt = select(Contact).options(load_only(*LIST_COLUMNS))
 
     if company_id:
-        query = query.filter(Contact.company_id == company_id)
+        stmt = stmt.where(Contact.company_id == company_id)
+
+    if include_total:
+        await set_total_estimate(response, db, stmt)
+
+    if cursor:
+        last_name, first_name, last_id = decode_cursor_key(cursor, str, str, int)
+        stmt = stmt.where(
+            tuple_(Contact.last_name, Contact.first_name, Contact.id) > (last_name, first_name, last_id)
+        )
+    else:
+        stmt = stmt.offset(skip)
+
+    result = await db.execute(
+        stmt.order_by(Contact.last_name, Contact.first_name, Contact.id).limit(limit)
+    )
+    contacts = result.scalars().all()
+
+    set_next_cursor(
+        response, contacts, limit,
+        lambda contact: (contact.last_name, contact.first_name, contact.id)
+    )
 
-    contacts = query.order_by(Contact.last_name, Contact.first_name).offset(skip).limit(limit).all()
     return contacts
 
 
 @router.get("/{contact_id}", response_model=ContactResponse)
-async def get_contact(contact_id: int, db: Session = Depends(get_db)):
+async def get_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific contact by ID"""
-    contact = db.query(Contact).filter(Contact.id == contact_id).first()
+    contact = await db.get(Contact, contact_id)
 
     if not contact:
         raise HTTPException(status_code=404, detail="Contact not found")
@@ -38,46 +71,43 @@ async def get_contact(contact_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=ContactResponse, status_code=201)
-async def create_contact(contact: ContactCreate, db: Session = Depends(get_db)):
+async def create_contact(contact: ContactCreate, db: AsyncSession = Depends(get_db)):
     """Create a new contact"""
-    contact_data = contact.model_dump()
-    contact_data['full_name'] = f"{contact.first_name} {contact.last_name}"
-
-    db_contact = Contact(**contact_data)
+    db_contact = Contact(**contact.model_dump())
     db.add(db_contact)
-    db.commit()
-    db.refresh(db_contact)
+    await db.commit()
+    await db.refresh(db_contact)
 
     return db_contact
 
 
 @router.patch("/{contact_id}", response_model=ContactResponse)
-async def update_contact(contact_id: int, contact_update: ContactCreate, db: Session = Depends(get_db)):
+async def update_contact(contact_id: int, contact_update: ContactCreate, db: AsyncSession = Depends(get_db)):
     """Update a contact"""
-    contact = db.query(Contact).filter(Contact.id == contact_id).first()
+    contact = await db.get(Contact, contact_id)
 
     if not contact:
         raise HTTPException(status_code=404, detail="Contact not found")
 
     update_data = contact_update.model_dump(exclude_unset=True)
-    update_data['full_name'] = f"{contact_update.first_name} {contact_update.last_name}"
-
     for field, value in update_data.items():
         setattr(contact, field, value)
 
-    db.commit()
-    db.refresh(contact)
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
+    await db.refresh(contact)
 
     return contact
 
 
 @router.delete("/{contact_id}", status_code=204)
-async def delete_contact(contact_id: int, db: Session = Depends(get_db)):
+async def delete_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a contact"""
-    contact = db.query(Contact).filter(Contact.id == contact_id).first()
+    contact = await db.get(Contact, contact_id)
 
     if not contact:
         raise HTTPException(status_code=404, detail="Contact not found")
 
-    db.delete(contact)
-    db.commit()
+    await db.delete(contact)
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
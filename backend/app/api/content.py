@@ -1,46 +1,66 @@
 """API endpoints for AI content generation"""
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload, selectinload, undefer
 from app.core.database import get_db
+from app.core import cache
 from app.models.lead import Lead, LeadActivity
 from app.schemas.lead import GenerateCallScriptRequest, GenerateEmailRequest
-from app.services.content_generator import ContentGeneratorService
+from app.services.content_generator import content_generator
 
 router = APIRouter()
 
 
+async def _get_leads_by_id(db: AsyncSession, lead_ids: list[int]) -> dict[int, Lead]:
+    """Load leads and their related data in one IN query, keyed by ID"""
+    result = await db.execute(
+        select(Lead).options(
+            selectinload(Lead.company),
+            selectinload(Lead.contact),
+            selectinload(Lead.job_posting),
+            undefer(Lead.notes),
+            raiseload('*')
+        ).where(Lead.id.in_(lead_ids))
+    )
+
+    return {lead.id: lead for lead in result.scalars()}
+
+
 @router.post("/call-script")
 async def generate_call_script(
     request: GenerateCallScriptRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Generate a personalized call script for a lead"""
     # Get lead with related data
-    lead = db.query(Lead).options(
+    lead = await db.get(Lead, request.lead_id, options=[
         joinedload(Lead.company),
         joinedload(Lead.contact),
-        joinedload(Lead.job_posting)
-    ).filter(Lead.id == request.lead_id).first()
+        joinedload(Lead.job_posting),
+        undefer(Lead.notes),
+        # Anything the prompt builder touches must be loaded above
+        raiseload('*')
+    ])
 
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
 
     # Generate script
-    generator = ContentGeneratorService()
-    script = await generator.generate_call_script(lead)
+    script = await content_generator.generate_call_script(lead)
 
     # Save to lead
     lead.call_script = script
-    db.commit()
 
-    # Log activity
+    # Log activity in the same transaction
     activity = LeadActivity(
         lead_id=lead.id,
         activity_type="call_script_generated",
         description="Call script generated"
     )
     db.add(activity)
-    db.commit()
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
 
     return {
         "lead_id": lead.id,
@@ -51,36 +71,38 @@ async def generate_call_script(
 @router.post("/email")
 async def generate_email(
     request: GenerateEmailRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Generate a personalized email for a lead"""
     # Get lead with related data
-    lead = db.query(Lead).options(
+    lead = await db.get(Lead, request.lead_id, options=[
         joinedload(Lead.company),
         joinedload(Lead.contact),
-        joinedload(Lead.job_posting)
-    ).filter(Lead.id == request.lead_id).first()
+        joinedload(Lead.job_posting),
+        undefer(Lead.notes),
+        # Anything the prompt builder touches must be loaded above
+        raiseload('*')
+    ])
 
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
 
     # Generate email
-    generator = ContentGeneratorService()
-    email = await generator.generate_email(lead, tone=request.tone)
+    email = await content_generator.generate_email(lead, tone=request.tone)
 
     # Save to lead
     lead.email_subject = email['subject']
     lead.email_body = email['body']
-    db.commit()
 
-    # Log activity
+    # Log activity in the same transaction
     activity = LeadActivity(
         lead_id=lead.id,
         activity_type="email_generated",
         description="Email generated"
     )
     db.add(activity)
-    db.commit()
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
 
     return {
         "lead_id": lead.id,
@@ -92,35 +114,35 @@ async def generate_email(
 @router.post("/batch/call-scripts")
 async def generate_batch_call_scripts(
     lead_ids: list[int],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Generate call scripts for multiple leads"""
-    generator = ContentGeneratorService()
     results = []
+    activities = []
+
+    leads = await _get_leads_by_id(db, lead_ids)
+    scripts = await content_generator.generate_call_scripts_bulk(list(leads.values()))
 
     for lead_id in lead_ids:
-        lead = db.query(Lead).options(
-            joinedload(Lead.company),
-            joinedload(Lead.contact),
-            joinedload(Lead.job_posting)
-        ).filter(Lead.id == lead_id).first()
+        lead = leads.get(lead_id)
 
         if lead:
-            script = await generator.generate_call_script(lead)
-            lead.call_script = script
-
-            activity = LeadActivity(
-                lead_id=lead.id,
-                activity_type="call_script_generated",
-                description="Call script generated (batch)"
-            )
-            db.add(activity)
+            lead.call_script = scripts[lead_id]
+            activities.append({
+                "lead_id": lead.id,
+                "activity_type": "call_script_generated",
+                "description": "Call script generated (batch)"
+            })
 
             results.append({"lead_id": lead_id, "status": "success"})
         else:
             results.append({"lead_id": lead_id, "status": "not_found"})
 
-    db.commit()
+    # One multi-row INSERT for the whole batch
+    if activities:
+        await db.execute(insert(LeadActivity), activities)
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
 
     return {
         "processed": len(lead_ids),
@@ -132,36 +154,37 @@ async def generate_batch_call_scripts(
 async def generate_batch_emails(
     lead_ids: list[int],
     tone: str = "professional",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Generate emails for multiple leads"""
-    generator = ContentGeneratorService()
     results = []
+    activities = []
+
+    leads = await _get_leads_by_id(db, lead_ids)
+    emails = await content_generator.generate_emails_bulk(list(leads.values()), tone=tone)
 
     for lead_id in lead_ids:
-        lead = db.query(Lead).options(
-            joinedload(Lead.company),
-            joinedload(Lead.contact),
-            joinedload(Lead.job_posting)
-        ).filter(Lead.id == lead_id).first()
+        lead = leads.get(lead_id)
 
         if lead:
-            email = await generator.generate_email(lead, tone=tone)
+            email = emails[lead_id]
             lead.email_subject = email['subject']
             lead.email_body = email['body']
-
-            activity = LeadActivity(
-                lead_id=lead.id,
-                activity_type="email_generated",
-                description="Email generated (batch)"
-            )
-            db.add(activity)
+            activities.append({
+                "lead_id": lead.id,
+                "activity_type": "email_generated",
+                "description": "Email generated (batch)"
+            })
 
             results.append({"lead_id": lead_id, "status": "success"})
         else:
             results.append({"lead_id": lead_id, "status": "not_found"})
 
-    db.commit()
+    # One multi-row INSERT for the whole batch
+    if activities:
+        await db.execute(insert(LeadActivity), activities)
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
 
     return {
         "processed": len(lead_ids),
@@ -1,16 +1,27 @@
 """API endpoints for manual job and company import"""
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterator, List, Tuple
 from app.core.database import get_db
-from app.models.lead import Company, JobPosting, Lead
+from app.core import cache
+from app.models.lead import Company, Contact, JobPosting, Lead, LeadStatus
 from app.schemas.lead import CompanyCreate, JobPostingCreate
+from app.utils.url import extract_domain
+from app.services.enrichment_free import free_enrichment_service
 import csv
+import hashlib
 import io
+from itertools import islice
 from datetime import datetime
 
 router = APIRouter()
 
+# Rows parsed and bulk-inserted per round trip during CSV import
+CSV_IMPORT_CHUNK_SIZE = 1000
+
 
 @router.post("/job/manual", status_code=201)
 async def create_manual_job(
@@ -23,45 +34,38 @@ async def create_manual_job(
     contact_email: str = None,
     contact_phone: str = None,
     notes: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Manually create a job posting and lead
     No API required - user enters information they've found
     """
     # Extract domain from website
-    domain = company_website.replace('http://', '').replace('https://', '').split('/')[0]
-
-    # Get or create company
-    company = db.query(Company).filter(Company.domain == domain).first()
+    domain = extract_domain(company_website)
 
-    if not company:
-        company = Company(
-            name=company_name,
-            domain=domain,
-            website=company_website,
-            address=location
-        )
-        db.add(company)
-        db.flush()
+    company_ids = await _upsert_companies(db, [{
+        'name': company_name,
+        'domain': domain,
+        'website': company_website,
+        'address': location
+    }])
+    company_id = company_ids[domain]
 
     # Create job posting
-    job = JobPosting(
-        company_id=company.id,
-        title=job_title,
-        description=job_description,
-        location=location,
-        source='manual',
-        external_id=f"manual_{datetime.now().timestamp()}",
-        posted_date=datetime.now()
-    )
-    db.add(job)
-    db.flush()
+    job_id = await _insert_job(db, {
+        'company_id': company_id,
+        'title': job_title,
+        'description': job_description,
+        'location': location,
+        'source': 'manual',
+        'external_id': job_external_id('manual', domain, job_title, location),
+        'posted_date': datetime.now()
+    })
 
     # Create lead
     lead = Lead(
-        company_id=company.id,
-        job_posting_id=job.id,
+        company_id=company_id,
+        job_posting_id=job_id,
         status='new',
         notes=notes
     )
@@ -69,27 +73,26 @@ async def create_manual_job(
 
     # If contact info provided, create contact
     if contact_name or contact_email:
-        from app.models.lead import Contact
         names = contact_name.split(' ') if contact_name else ['', '']
         contact = Contact(
-            company_id=company.id,
+            company_id=company_id,
             first_name=names[0] if len(names) > 0 else '',
             last_name=names[-1] if len(names) > 1 else '',
-            full_name=contact_name or '',
             email=contact_email,
             phone=contact_phone,
             source='manual'
         )
         db.add(contact)
-        db.flush()
+        await db.flush()
         lead.contact_id = contact.id
 
-    db.commit()
-    db.refresh(lead)
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
+    await db.refresh(lead)
 
     return {
         "lead_id": lead.id,
-        "company_id": company.id,
+        "company_id": company_id,
         "message": "Lead created successfully"
     }
 
@@ -97,7 +100,7 @@ async def create_manual_job(
 @router.post("/jobs/csv", status_code=201)
 async def import_jobs_csv(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Import jobs from CSV file
@@ -106,79 +109,29 @@ async def import_jobs_csv(
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be a CSV")
 
-    contents = await file.read()
-    csv_data = io.StringIO(contents.decode('utf-8'))
-    reader = csv.DictReader(csv_data)
+    # Stream the spooled upload and insert a chunk at a time, so memory stays
+    # flat regardless of file size; reads run off the event loop
+    reader = enumerate(csv.DictReader(io.TextIOWrapper(file.file, encoding='utf-8', newline='')), start=1)
 
     created_leads = []
     errors = []
 
-    for row_num, row in enumerate(reader, start=1):
+    while True:
         try:
-            # Extract domain
-            website = row.get('company_website', '')
-            domain = website.replace('http://', '').replace('https://', '').split('/')[0]
-
-            # Get or create company
-            company = db.query(Company).filter(Company.domain == domain).first()
-            if not company:
-                company = Company(
-                    name=row.get('company_name', ''),
-                    domain=domain,
-                    website=website,
-                    address=row.get('location', '')
-                )
-                db.add(company)
-                db.flush()
-
-            # Create job
-            job = JobPosting(
-                company_id=company.id,
-                title=row.get('job_title', ''),
-                description=row.get('job_description', ''),
-                location=row.get('location', ''),
-                source='csv_import',
-                external_id=f"csv_{datetime.now().timestamp()}_{row_num}",
-                posted_date=datetime.now()
-            )
-            db.add(job)
-            db.flush()
-
-            # Create lead
-            lead = Lead(
-                company_id=company.id,
-                job_posting_id=job.id,
-                status='new'
-            )
-            db.add(lead)
-            db.flush()
-
-            # Create contact if provided
-            contact_name = row.get('contact_name', '')
-            contact_email = row.get('contact_email', '')
-
-            if contact_name or contact_email:
-                from app.models.lead import Contact
-                names = contact_name.split(' ') if contact_name else ['', '']
-                contact = Contact(
-                    company_id=company.id,
-                    first_name=names[0],
-                    last_name=names[-1] if len(names) > 1 else '',
-                    full_name=contact_name,
-                    email=contact_email,
-                    phone=row.get('contact_phone', ''),
-                    source='csv_import'
-                )
-                db.add(contact)
-                db.flush()
-                lead.contact_id = contact.id
-
-            created_leads.append(lead.id)
+            rows, chunk_errors = await run_in_threadpool(_read_csv_chunk, reader, CSV_IMPORT_CHUNK_SIZE)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
 
-        except Exception as e:
-            errors.append(f"Row {row_num}: {str(e)}")
+        errors.extend(chunk_errors)
+        if rows:
+            lead_ids, duplicate_errors = await _import_csv_rows(db, rows)
+            created_leads.extend(lead_ids)
+            errors.extend(duplicate_errors)
+        if len(rows) + len(chunk_errors) < CSV_IMPORT_CHUNK_SIZE:
+            break
 
-    db.commit()
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
 
     return {
         "leads_created": len(created_leads),
@@ -187,23 +140,188 @@ async def import_jobs_csv(
     }
 
 
+def _read_csv_chunk(reader: Iterator[Tuple[int, dict]], size: int) -> Tuple[List[dict], List[str]]:
+    """Parse up to size numbered rows from the reader"""
+    rows = []
+    errors = []
+
+    for row_num, row in islice(reader, size):
+        try:
+            rows.append(_parse_csv_row(row_num, row))
+        except Exception as e:
+            errors.append(f"Row {row_num}: {str(e)}")
+
+    return rows, errors
+
+
+def _parse_csv_row(row_num: int, row: dict) -> dict:
+    """Normalize one CSV row into the fields used by the bulk import"""
+    website = row.get('company_website', '')
+    contact_name = row.get('contact_name', '')
+    names = contact_name.split(' ') if contact_name else ['', '']
+
+    return {
+        'row_num': row_num,
+        'company_name': row.get('company_name', ''),
+        'website': website,
+        'domain': extract_domain(website),
+        'job_title': row.get('job_title', ''),
+        'job_description': row.get('job_description', ''),
+        'location': row.get('location', ''),
+        'contact_name': contact_name,
+        'contact_first_name': names[0],
+        'contact_last_name': names[-1] if len(names) > 1 else '',
+        'contact_email': row.get('contact_email', ''),
+        'contact_phone': row.get('contact_phone', ''),
+    }
+
+
+def job_external_id(source: str, domain: str, title: str, location: str = None) -> str:
+    """Content-derived external ID, so re-importing the same job is detectable"""
+    digest = hashlib.sha1(f"{domain}|{title}|{location or ''}".encode()).hexdigest()[:16]
+    return f"{source}_{digest}"
+
+
+async def _insert_job(db: AsyncSession, job: dict) -> int:
+    """Insert a single imported job, rejecting one that was already imported"""
+    job_id = await db.scalar(
+        pg_insert(JobPosting).values(job).on_conflict_do_nothing(
+            index_elements=['external_id']
+        ).returning(JobPosting.id)
+    )
+
+    if job_id is None:
+        raise HTTPException(status_code=400, detail="This job has already been imported")
+
+    return job_id
+
+
+async def _upsert_companies(db: AsyncSession, companies: List[dict]) -> dict[str, int]:
+    """
+    Get or create companies by lowercase domain in one statement
+    ON CONFLICT against the unique lower(domain) index is safe under
+    concurrent imports; the no-op update makes RETURNING include existing rows
+    """
+    stmt = pg_insert(Company).values(companies)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[func.lower(Company.domain)],
+        set_={'domain': stmt.excluded.domain}
+    ).returning(Company.domain, Company.id)
+
+    result = await db.execute(stmt)
+    return dict(result.all())
+
+
+async def _import_csv_rows(db: AsyncSession, rows: List[dict]) -> Tuple[List[int], List[str]]:
+    """
+    Bulk-insert companies, jobs, contacts and leads for parsed CSV rows
+    One statement per table instead of several round trips per row;
+    returns the created lead IDs in row order and errors for rows whose
+    job was already imported
+    """
+    # One company per distinct domain, first row wins
+    companies = {}
+    for row in rows:
+        companies.setdefault(row['domain'], {
+            'name': row['company_name'],
+            'domain': row['domain'],
+            'website': row['website'],
+            'address': row['location']
+        })
+
+    company_ids = await _upsert_companies(db, list(companies.values()))
+
+    # Jobs, one per row; rows already imported (earlier uploads or repeats
+    # within this one) hit the external_id unique index and are skipped
+    now = datetime.now()
+    external_ids = [
+        job_external_id('csv_import', row['domain'], row['job_title'], row['location'])
+        for row in rows
+    ]
+    result = await db.execute(
+        pg_insert(JobPosting).values([
+            {
+                'company_id': company_ids[row['domain']],
+                'title': row['job_title'],
+                'description': row['job_description'],
+                'location': row['location'],
+                'source': 'csv_import',
+                'external_id': external_id,
+                'posted_date': now
+            }
+            for row, external_id in zip(rows, external_ids)
+        ]).on_conflict_do_nothing(
+            index_elements=['external_id']
+        ).returning(JobPosting.external_id, JobPosting.id)
+    )
+    inserted_jobs = dict(result.all())
+
+    job_ids = []
+    errors = []
+    for row, external_id in zip(rows, external_ids):
+        # pop so a repeated row within the file counts as a duplicate
+        job_id = inserted_jobs.pop(external_id, None)
+        if job_id is None:
+            errors.append(f"Row {row['row_num']}: job already imported")
+        job_ids.append(job_id)
+
+    rows_with_jobs = [i for i, job_id in enumerate(job_ids) if job_id is not None]
+
+    # Contacts, for rows that provide one
+    contact_rows = [i for i in rows_with_jobs if rows[i]['contact_name'] or rows[i]['contact_email']]
+    contact_ids = {}
+
+    if contact_rows:
+        result = await db.execute(
+            insert(Contact).returning(Contact.id, sort_by_parameter_order=True),
+            [
+                {
+                    'company_id': company_ids[rows[i]['domain']],
+                    'first_name': rows[i]['contact_first_name'],
+                    'last_name': rows[i]['contact_last_name'],
+                    'email': rows[i]['contact_email'],
+                    'phone': rows[i]['contact_phone'],
+                    'source': 'csv_import'
+                }
+                for i in contact_rows
+            ]
+        )
+        contact_ids = dict(zip(contact_rows, result.scalars().all()))
+
+    if not rows_with_jobs:
+        return [], errors
+
+    # Leads, linking the rows above
+    result = await db.execute(
+        insert(Lead).returning(Lead.id, sort_by_parameter_order=True),
+        [
+            {
+                'company_id': company_ids[rows[i]['domain']],
+                'job_posting_id': job_ids[i],
+                'contact_id': contact_ids.get(i),
+                'status': LeadStatus.NEW
+            }
+            for i in rows_with_jobs
+        ]
+    )
+
+    return list(result.scalars().all()), errors
+
+
 @router.post("/company/enrich-free", status_code=200)
 async def enrich_company_free(
     company_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Free company enrichment using public data sources
     No API keys required
     """
-    from app.services.enrichment_free import FreeEnrichmentService
-
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
 
-    enrichment = FreeEnrichmentService()
-    enriched_data = await enrichment.enrich_company_free(company)
+    enriched_data = await free_enrichment_service.enrich_company_free(company)
 
     # Update company
     for key, value in enriched_data.items():
@@ -211,8 +329,9 @@ async def enrich_company_free(
             setattr(company, key, value)
 
     company.last_enriched_at = datetime.now()
-    db.commit()
-    db.refresh(company)
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
+    await db.refresh(company)
 
     return {
         "company_id": company_id,
@@ -226,27 +345,20 @@ async def suggest_contact_emails(
     company_id: int,
     first_name: str,
     last_name: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Suggest possible email formats for a contact
     No API required - uses common patterns
     """
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
 
-    domain = company.domain or company.website.replace('http://', '').replace('https://', '').split('/')[0]
+    domain = company.domain or extract_domain(company.website)
 
-    # Common email patterns
-    patterns = [
-        f"{first_name.lower()}.{last_name.lower()}@{domain}",
-        f"{first_name.lower()}{last_name.lower()}@{domain}",
-        f"{first_name[0].lower()}{last_name.lower()}@{domain}",
-        f"{first_name.lower()}@{domain}",
-        f"{first_name.lower()}{last_name[0].lower()}@{domain}",
-        f"{first_name[0].lower()}.{last_name.lower()}@{domain}",
-    ]
+    # Same EMAIL_TEMPLATES table as free enrichment, so the two can't drift apart
+    patterns = await free_enrichment_service.guess_contact_email(first_name, last_name, domain)
 
     return {
         "suggested_emails": patterns,
@@ -260,50 +372,42 @@ async def capture_from_bookmarklet(
     title: str,
     company_name: str = None,
     description: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Capture job posting data from a bookmarklet
     User clicks bookmarklet while on a job posting page
     """
-    # Extract domain from URL
-    from urllib.parse import urlparse
-    parsed = urlparse(url)
-    domain = parsed.netloc.replace('www.', '')
+    domain = extract_domain(url)
 
-    # Get or create company
-    company = db.query(Company).filter(Company.domain == domain).first()
-    if not company:
-        company = Company(
-            name=company_name or domain,
-            domain=domain,
-            website=f"https://{domain}"
-        )
-        db.add(company)
-        db.flush()
+    company_ids = await _upsert_companies(db, [{
+        'name': company_name or domain,
+        'domain': domain,
+        'website': f"https://{domain}"
+    }])
+    company_id = company_ids[domain]
 
     # Create job posting
-    job = JobPosting(
-        company_id=company.id,
-        title=title,
-        description=description or "",
-        source='bookmarklet',
-        external_id=f"bookmarklet_{datetime.now().timestamp()}",
-        external_url=url,
-        posted_date=datetime.now()
-    )
-    db.add(job)
-    db.flush()
+    job_id = await _insert_job(db, {
+        'company_id': company_id,
+        'title': title,
+        'description': description or "",
+        'source': 'bookmarklet',
+        'external_id': job_external_id('bookmarklet', domain, title, url),
+        'external_url': url,
+        'posted_date': datetime.now()
+    })
 
     # Create lead
     lead = Lead(
-        company_id=company.id,
-        job_posting_id=job.id,
+        company_id=company_id,
+        job_posting_id=job_id,
         status='new'
     )
     db.add(lead)
-    db.commit()
-    db.refresh(lead)
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
+    await db.refresh(lead)
 
     return {
         "lead_id": lead.id,
@@ -1,17 +1,34 @@
 """API endpoints for third-party integrations"""
+from functools import lru_cache
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.config import settings
-from app.services.enrichment import EnrichmentService
+from app.core import cache
+from app.services.enrichment import enrichment_service
 from app.models.lead import Company, Contact
 
 router = APIRouter()
 
 
+def enrichment_cache_key(company_id: int) -> str:
+    return f"enrich:co:{company_id}"
+
+
+def contacts_cache_key(company_id: int) -> str:
+    return f"contacts:co:{company_id}"
+
+
 @router.get("/status")
 async def get_integration_status():
     """Get the status of all integrations"""
+    return _integration_status()
+
+
+@lru_cache(maxsize=1)
+def _integration_status() -> dict:
+    """Settings are fixed for the life of the process, so build this once"""
     return {
         "openai": {
             "enabled": bool(settings.OPENAI_API_KEY),
@@ -45,18 +62,22 @@ async def get_integration_status():
 
 
 @router.post("/enrich/company/{company_id}")
-async def enrich_company(company_id: int, db: Session = Depends(get_db)):
+async def enrich_company(company_id: int, db: AsyncSession = Depends(get_db)):
     """
     Enrich company data using available integrations
     (LinkedIn, ZoomInfo, Apollo, etc.)
     """
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
 
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
 
-    enrichment_service = EnrichmentService()
-    enriched_data = await enrichment_service.enrich_company(company)
+    # Third-party lookups are paid; reuse a recent result for this company
+    cache_key = enrichment_cache_key(company_id)
+    enriched_data = await cache.get_json(cache_key)
+    if enriched_data is None:
+        enriched_data = await enrichment_service.enrich_company(company)
+        await cache.set_json(cache_key, enriched_data, settings.ENRICHMENT_CACHE_TTL_SECONDS)
 
     # Update company with enriched data
     for key, value in enriched_data.items():
@@ -65,8 +86,9 @@ async def enrich_company(company_id: int, db: Session = Depends(get_db)):
 
     from datetime import datetime
     company.last_enriched_at = datetime.now()
-    db.commit()
-    db.refresh(company)
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
+    await db.refresh(company)
 
     return {
         "company_id": company_id,
@@ -76,33 +98,35 @@ async def enrich_company(company_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/discover/contacts/{company_id}")
-async def discover_contacts(company_id: int, db: Session = Depends(get_db)):
+async def discover_contacts(company_id: int, db: AsyncSession = Depends(get_db)):
     """
     Discover contacts for a company using LinkedIn, ZoomInfo, Apollo
     """
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
 
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
 
-    enrichment_service = EnrichmentService()
-    contacts = await enrichment_service.discover_contacts(company)
+    cache_key = contacts_cache_key(company_id)
+    contacts = await cache.get_json(cache_key)
+    if contacts is None:
+        contacts = await enrichment_service.discover_contacts(company)
+        await cache.set_json(cache_key, contacts, settings.ENRICHMENT_CACHE_TTL_SECONDS)
 
     # Save discovered contacts
     saved_contacts = []
     for contact_data in contacts:
         # Check if contact already exists
-        existing = db.query(Contact).filter(
+        existing = await db.scalar(select(Contact.id).where(
             Contact.company_id == company_id,
             Contact.email == contact_data.get('email')
-        ).first()
+        ))
 
         if not existing and contact_data.get('email'):
             contact = Contact(
                 company_id=company_id,
                 first_name=contact_data.get('first_name', ''),
                 last_name=contact_data.get('last_name', ''),
-                full_name=contact_data.get('full_name', ''),
                 title=contact_data.get('title'),
                 department=contact_data.get('department'),
                 email=contact_data.get('email'),
@@ -114,7 +138,7 @@ async def discover_contacts(company_id: int, db: Session = Depends(get_db)):
             db.add(contact)
             saved_contacts.append(contact)
 
-    db.commit()
+    await db.commit()
 
     return {
         "company_id": company_id,
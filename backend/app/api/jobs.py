@@ -1,51 +1,101 @@
 """API endpoints for job posting management"""
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 from typing import List, Optional
+from datetime import datetime
 from app.core.database import get_db
+from app.core import cache
+from app.api.pagination import decode_cursor_key, set_next_cursor, set_total_estimate
 from app.models.lead import JobPosting
-from app.schemas.lead import JobPostingCreate, JobPostingResponse
+from app.schemas.lead import JobPostingCreate, JobPostingResponse, JobPostingSummaryResponse
 
 router = APIRouter()
 
+# List queries fetch only what the list schema serializes
+LIST_COLUMNS = [getattr(JobPosting, name) for name in JobPostingSummaryResponse.model_fields]
 
-@router.get("/", response_model=List[JobPostingResponse])
+
+@router.get("/", response_model=List[JobPostingSummaryResponse])
 async def get_job_postings(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page; replaces skip"),
+    include_total: bool = Query(False, description="Return the filtered row count in X-Total-Estimate"),
+    search: Optional[str] = None,
     company_id: Optional[int] = None,
     source: Optional[str] = None,
     city: Optional[str] = None,
     state: Optional[str] = None,
     is_remote: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all job postings with optional filtering"""
-    query = db.query(JobPosting)
+    """
+    Get all job postings with optional filtering
+    Pages by (posted_date, id) keyset via cursor; ranked search results page by skip
+    """
+    stmt = select(JobPosting).options(load_only(*LIST_COLUMNS))
+
+    order_by = [JobPosting.posted_date.desc()]
+
+    # Full-text match on title/description, best matches first
+    if search:
+        ts_query = func.plainto_tsquery('english', search)
+        stmt = stmt.where(JobPosting.tsv.op('@@')(ts_query))
+        order_by.insert(0, func.ts_rank(JobPosting.tsv, ts_query).desc())
 
     if company_id:
-        query = query.filter(JobPosting.company_id == company_id)
+        stmt = stmt.where(JobPosting.company_id == company_id)
 
     if source:
-        query = query.filter(JobPosting.source == source)
+        stmt = stmt.where(JobPosting.source == source)
 
+    # lower(...) LIKE matches the trigram indexes on lower(column)
     if city:
-        query = query.filter(JobPosting.city.ilike(f"%{city}%"))
+        stmt = stmt.where(func.lower(JobPosting.city).like(f"%{city.lower()}%"))
 
     if state:
-        query = query.filter(JobPosting.state.ilike(f"%{state}%"))
+        stmt = stmt.where(func.lower(JobPosting.state).like(f"%{state.lower()}%"))
 
     if is_remote is not None:
-        query = query.filter(JobPosting.is_remote == is_remote)
+        stmt = stmt.where(JobPosting.is_remote == is_remote)
+
+    if include_total:
+        await set_total_estimate(response, db, stmt)
+
+    # Relevance order has no stable seek key, so only unranked lists use cursors
+    if cursor and search:
+        raise HTTPException(status_code=400, detail="cursor cannot be combined with search")
+
+    if cursor:
+        posted_date, last_id = decode_cursor_key(cursor, Optional[datetime], int)
+
+        if posted_date is None:
+            # NULL posted_date sorts first under DESC: finish those, then every dated row
+            stmt = stmt.where(or_(
+                and_(JobPosting.posted_date.is_(None), JobPosting.id < last_id),
+                JobPosting.posted_date.isnot(None)
+            ))
+        else:
+            stmt = stmt.where(tuple_(JobPosting.posted_date, JobPosting.id) < (posted_date, last_id))
+    else:
+        stmt = stmt.offset(skip)
+
+    result = await db.execute(stmt.order_by(*order_by, JobPosting.id.desc()).limit(limit))
+    jobs = result.scalars().all()
+
+    if not search:
+        set_next_cursor(response, jobs, limit, lambda job: (job.posted_date, job.id))
 
-    jobs = query.order_by(JobPosting.posted_date.desc()).offset(skip).limit(limit).all()
     return jobs
 
 
 @router.get("/{job_id}", response_model=JobPostingResponse)
-async def get_job_posting(job_id: int, db: Session = Depends(get_db)):
+async def get_job_posting(job_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific job posting by ID"""
-    job = db.query(JobPosting).filter(JobPosting.id == job_id).first()
+    job = await db.get(JobPosting, job_id)
 
     if not job:
         raise HTTPException(status_code=404, detail="Job posting not found")
@@ -54,28 +104,29 @@ async def get_job_posting(job_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=JobPostingResponse, status_code=201)
-async def create_job_posting(job: JobPostingCreate, db: Session = Depends(get_db)):
+async def create_job_posting(job: JobPostingCreate, db: AsyncSession = Depends(get_db)):
     """Create a new job posting"""
     # Check if job with same external_id already exists
-    existing = db.query(JobPosting).filter(JobPosting.external_id == job.external_id).first()
+    existing = await db.scalar(select(JobPosting.id).where(JobPosting.external_id == job.external_id))
     if existing:
         raise HTTPException(status_code=400, detail="Job posting with this external ID already exists")
 
     db_job = JobPosting(**job.model_dump())
     db.add(db_job)
-    db.commit()
-    db.refresh(db_job)
+    await db.commit()
+    await db.refresh(db_job)
 
     return db_job
 
 
 @router.delete("/{job_id}", status_code=204)
-async def delete_job_posting(job_id: int, db: Session = Depends(get_db)):
+async def delete_job_posting(job_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a job posting"""
-    job = db.query(JobPosting).filter(JobPosting.id == job_id).first()
+    job = await db.get(JobPosting, job_id)
 
     if not job:
         raise HTTPException(status_code=404, detail="Job posting not found")
 
-    db.delete(job)
-    db.commit()
+    await db.delete(job)
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
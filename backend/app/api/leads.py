@@ -1,77 +1,170 @@
 """API endpoints for lead management"""
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, bindparam, insert, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload, undefer_group
 from typing import List, Optional
+from datetime import datetime
+from app.api.pagination import decode_cursor_key, next_cursor_headers
 from app.core.database import get_db
-from app.models.lead import Lead, LeadStatus, LeadActivity
+from app.core import cache
+from app.models.lead import Company, Contact, JobPosting, Lead, LeadStatus, LeadActivity
 from app.schemas.lead import (
-    LeadCreate, LeadUpdate, LeadResponse, LeadStatusEnum,
+    LeadCreate, LeadUpdate, LeadResponse, LeadListItem, LeadStatusEnum,
     LeadActivityCreate, LeadActivityResponse
 )
 
 router = APIRouter()
 
+EXPORT_BATCH_SIZE = 500
+
+LEAD_LIST_COLUMNS = (
+    Lead.id,
+    Lead.company_id,
+    Lead.contact_id,
+    Lead.job_posting_id,
+    Lead.status,
+    Lead.score,
+    Lead.created_at,
+    Company.name.label("company_name"),
+    Company.city.label("company_city"),
+    Company.state.label("company_state"),
+    Contact.full_name.label("contact_full_name"),
+    Contact.title.label("contact_title"),
+    Contact.email.label("contact_email"),
+    JobPosting.title.label("job_title"),
+)
 
-@router.get("/", response_model=List[LeadResponse])
-async def get_leads(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, le=1000),
-    status: Optional[LeadStatusEnum] = None,
-    db: Session = Depends(get_db)
-):
-    """Get all leads with optional filtering"""
-    query = db.query(Lead).options(
+
+# Fixed statements are built once; executions only bind lead_id
+LEAD_DETAIL_STMT = (
+    select(Lead)
+    .options(
         joinedload(Lead.company),
         joinedload(Lead.contact),
-        joinedload(Lead.job_posting)
+        joinedload(Lead.job_posting),
+        undefer_group("content"),
+        raiseload('*')
+    )
+    .where(Lead.id == bindparam("lead_id"))
+    # Reload a lead already in the session after writes
+    .execution_options(populate_existing=True)
+)
+
+LEAD_ACTIVITIES_STMT = (
+    select(LeadActivity)
+    .where(LeadActivity.lead_id == bindparam("lead_id"))
+    .order_by(LeadActivity.created_at.desc())
+)
+
+
+async def _get_lead(db: AsyncSession, lead_id: int) -> Optional[Lead]:
+    """Load a lead with the relations LeadResponse serializes"""
+    result = await db.execute(LEAD_DETAIL_STMT, {"lead_id": lead_id})
+    return result.scalar_one_or_none()
+
+
+def _lead_list_query(status: Optional[LeadStatusEnum]) -> Select:
+    """Plain LeadListItem rows from one join; no ORM instances to build per lead"""
+    stmt = (
+        select(*LEAD_LIST_COLUMNS)
+        .join(Company, Lead.company_id == Company.id)
+        .outerjoin(Contact, Lead.contact_id == Contact.id)
+        .outerjoin(JobPosting, Lead.job_posting_id == JobPosting.id)
     )
 
     if status:
-        query = query.filter(Lead.status == status.value)
+        stmt = stmt.where(Lead.status == status.value)
+
+    return stmt.order_by(Lead.created_at.desc(), Lead.id.desc())
 
-    leads = query.order_by(Lead.created_at.desc()).offset(skip).limit(limit).all()
-    return leads
+
+@router.get("/", response_model=List[LeadListItem])
+async def get_leads(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page; replaces skip"),
+    status: Optional[LeadStatusEnum] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get all leads with optional filtering
+    Pages by (created_at, id) keyset via cursor, newest first
+    """
+    if cursor:
+        created_at, last_id = decode_cursor_key(cursor, datetime, int)
+
+    async def load():
+        stmt = _lead_list_query(status)
+
+        if cursor:
+            stmt = stmt.where(tuple_(Lead.created_at, Lead.id) < (created_at, last_id))
+        else:
+            stmt = stmt.offset(skip)
+
+        result = await db.execute(stmt.limit(limit))
+        return [LeadListItem.model_validate(row).model_dump(mode="json") for row in result]
+
+    def headers(leads: list) -> dict:
+        return next_cursor_headers(leads, limit, lambda lead: (lead["created_at"], lead["id"]))
+
+    status_key = status.value if status else "all"
+    page_key = f"after:{cursor}" if cursor else f"skip:{skip}"
+    return await cache.cached_response(cache.LEADS, f"list:{page_key}:{limit}:{status_key}", load, headers)
+
+
+@router.get("/export")
+async def export_leads(status: Optional[LeadStatusEnum] = None, db: AsyncSession = Depends(get_db)):
+    """
+    Export every lead as newline-delimited JSON, in list order
+    Rows are streamed from a server-side cursor, so memory stays flat
+    however many leads there are
+    """
+    async def rows():
+        result = await db.stream(_lead_list_query(status).execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for row in result:
+            yield orjson.dumps(row._asdict()) + b"\n"
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
 
 
 @router.get("/{lead_id}", response_model=LeadResponse)
-async def get_lead(lead_id: int, db: Session = Depends(get_db)):
+async def get_lead(lead_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific lead by ID"""
-    lead = db.query(Lead).options(
-        joinedload(Lead.company),
-        joinedload(Lead.contact),
-        joinedload(Lead.job_posting)
-    ).filter(Lead.id == lead_id).first()
+    async def load():
+        lead = await _get_lead(db, lead_id)
 
-    if not lead:
-        raise HTTPException(status_code=404, detail="Lead not found")
+        if not lead:
+            raise HTTPException(status_code=404, detail="Lead not found")
+
+        return LeadResponse.model_validate(lead).model_dump(mode="json")
 
-    return lead
+    return await cache.cached_response(cache.LEADS, f"detail:{lead_id}", load)
 
 
 @router.post("/", response_model=LeadResponse, status_code=201)
-async def create_lead(lead: LeadCreate, db: Session = Depends(get_db)):
+async def create_lead(lead: LeadCreate, db: AsyncSession = Depends(get_db)):
     """Create a new lead"""
-    db_lead = Lead(**lead.model_dump())
-    db.add(db_lead)
-    db.commit()
-    db.refresh(db_lead)
+    # INSERT the lead and its activity in one statement, chained by RETURNING
+    new_lead = insert(Lead).values(**lead.model_dump()).returning(Lead.id).cte("new_lead")
+    stmt = insert(LeadActivity).from_select(
+        [LeadActivity.lead_id, LeadActivity.activity_type, LeadActivity.description],
+        select(new_lead.c.id, literal("created"), literal("Lead created"))
+    ).returning(LeadActivity.lead_id)
 
-    # Log activity
-    activity = LeadActivity(
-        lead_id=db_lead.id,
-        activity_type="created",
-        description="Lead created"
-    )
-    db.add(activity)
-    db.commit()
+    lead_id = (await db.execute(stmt)).scalar_one()
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
 
-    return db_lead
+    return await _get_lead(db, lead_id)
 
 
 @router.patch("/{lead_id}", response_model=LeadResponse)
-async def update_lead(lead_id: int, lead_update: LeadUpdate, db: Session = Depends(get_db)):
+async def update_lead(lead_id: int, lead_update: LeadUpdate, db: AsyncSession = Depends(get_db)):
     """Update a lead"""
-    lead = db.query(Lead).filter(Lead.id == lead_id).first()
+    lead = await db.get(Lead, lead_id)
 
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
@@ -81,59 +174,58 @@ async def update_lead(lead_id: int, lead_update: LeadUpdate, db: Session = Depen
     for field, value in update_data.items():
         setattr(lead, field, value)
 
-    db.commit()
-    db.refresh(lead)
-
-    # Log activity
+    # Log activity in the same transaction
     activity = LeadActivity(
         lead_id=lead.id,
         activity_type="updated",
         description="Lead updated",
-        metadata=update_data
+        extra_data={"changed_fields": list(update_data)}
     )
     db.add(activity)
-    db.commit()
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
 
-    return lead
+    return await _get_lead(db, lead.id)
 
 
 @router.delete("/{lead_id}", status_code=204)
-async def delete_lead(lead_id: int, db: Session = Depends(get_db)):
+async def delete_lead(lead_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a lead"""
-    lead = db.query(Lead).filter(Lead.id == lead_id).first()
+    lead = await db.get(Lead, lead_id)
 
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
 
-    db.delete(lead)
-    db.commit()
+    await db.delete(lead)
+    await db.commit()
+    await cache.bump_generation(cache.LEADS)
 
 
 @router.post("/{lead_id}/activities", response_model=LeadActivityResponse, status_code=201)
 async def add_lead_activity(
     lead_id: int,
     activity: LeadActivityCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Add an activity to a lead"""
     # Verify lead exists
-    lead = db.query(Lead).filter(Lead.id == lead_id).first()
+    lead = await db.get(Lead, lead_id)
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
 
-    db_activity = LeadActivity(**activity.model_dump())
+    db_activity = LeadActivity(
+        **activity.model_dump(exclude={"metadata"}),
+        extra_data=activity.metadata
+    )
     db.add(db_activity)
-    db.commit()
-    db.refresh(db_activity)
+    await db.commit()
+    await db.refresh(db_activity)
 
     return db_activity
 
 
 @router.get("/{lead_id}/activities", response_model=List[LeadActivityResponse])
-async def get_lead_activities(lead_id: int, db: Session = Depends(get_db)):
+async def get_lead_activities(lead_id: int, db: AsyncSession = Depends(get_db)):
     """Get all activities for a lead"""
-    activities = db.query(LeadActivity).filter(
-        LeadActivity.lead_id == lead_id
-    ).order_by(LeadActivity.created_at.desc()).all()
-
-    return activities
+    result = await db.execute(LEAD_ACTIVITIES_STMT, {"lead_id": lead_id})
+    return result.scalars().all()
@@ -0,0 +1,118 @@
+"""Keyset (seek) pagination helpers for list endpoints"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Sequence, get_args
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_ESTIMATE_HEADER = "X-Total-Estimate"
+
+# Range of the Postgres integer id columns cursors seek on
+INT_MIN, INT_MAX = -2 ** 31, 2 ** 31 - 1
+
+# Below this many estimated rows an exact COUNT(*) is cheap enough to run
+EXACT_COUNT_THRESHOLD = 10_000
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the last row's sort key as an opaque, URL-safe cursor"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Decode a cursor produced by encode_cursor, rejecting malformed input"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        values = None
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return values
+
+
+def decode_cursor_key(cursor: str, *types) -> list:
+    """
+    Decode a cursor into its sort key, checking each value against types
+    Types are str, int or datetime, or Optional[...] of one; a value that
+    doesn't fit is a 400 here rather than a database error later
+    """
+    values = decode_cursor(cursor, len(types))
+    return [_cursor_value(value, expected) for value, expected in zip(values, types)]
+
+
+def _cursor_value(value: Any, expected) -> Any:
+    """Check or parse one sort key value, rejecting anything that doesn't fit"""
+    nullable = type(None) in get_args(expected)
+    if nullable:
+        expected = next(arg for arg in get_args(expected) if arg is not type(None))
+
+    if value is None:
+        if nullable:
+            return None
+    elif expected is datetime:
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                pass
+    elif expected is int:
+        # bool is an int subclass, but never a valid id
+        if isinstance(value, int) and not isinstance(value, bool) and INT_MIN <= value <= INT_MAX:
+            return value
+    elif expected is str:
+        # Postgres text can't hold NUL
+        if isinstance(value, str) and "\x00" not in value:
+            return value
+
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def set_next_cursor(
+    response: Response,
+    rows: Sequence,
+    limit: int,
+    sort_key: Callable[[Any], tuple]
+):
+    """Expose the cursor for the following page when this page is full"""
+    response.headers.update(next_cursor_headers(rows, limit, sort_key))
+
+
+def next_cursor_headers(rows: Sequence, limit: int, sort_key: Callable[[Any], tuple]) -> dict:
+    """Headers carrying the next page's cursor, empty on the last page"""
+    if rows and len(rows) == limit:
+        return {NEXT_CURSOR_HEADER: encode_cursor(*sort_key(rows[-1]))}
+    return {}
+
+
+async def estimate_count(db: AsyncSession, stmt: Select) -> int:
+    """Planner row estimate for a query, read from EXPLAIN without running it"""
+    compiled = stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"render_postcompile": True})
+    conn = await db.connection()
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def set_total_estimate(response: Response, db: AsyncSession, stmt: Select):
+    """
+    Expose the filtered row count without a full COUNT(*) on large tables
+    Uses the planner estimate, replaced by an exact count when it is small
+    """
+    total = await estimate_count(db, stmt)
+
+    if total < EXACT_COUNT_THRESHOLD:
+        total = await db.scalar(
+            stmt.with_only_columns(func.count(), maintain_column_froms=True).order_by(None)
+        )
+
+    response.headers[TOTAL_ESTIMATE_HEADER] = str(total)
@@ -1,11 +1,14 @@
 """API endpoints for route planning"""
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload
 from typing import List
 from app.core.database import get_db
+from app.core import cache
 from app.models.lead import Lead, LeadActivity
 from app.schemas.lead import RoutePlanRequest, RoutePlanResponse, RouteStop
-from app.services.route_planner import RoutePlannerService
+from app.services.route_planner import route_planner
 
 router = APIRouter()
 
@@ -13,15 +16,16 @@ router = APIRouter()
 @router.post("/plan", response_model=RoutePlanResponse)
 async def plan_route(
     request: RoutePlanRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create an optimized route plan for visiting multiple companies
     """
     # Get leads with company data
-    leads = db.query(Lead).options(
-        joinedload(Lead.company)
-    ).filter(Lead.id.in_(request.lead_ids)).all()
+    result = await db.execute(
+        select(Lead).options(joinedload(Lead.company), raiseload('*')).where(Lead.id.in_(request.lead_ids))
+    )
+    leads = result.scalars().all()
 
     if not leads:
         raise HTTPException(status_code=404, detail="No leads found")
@@ -38,24 +42,28 @@ async def plan_route(
             detail="No leads have valid addresses for route planning"
         )
 
-    # Plan route
-    planner = RoutePlannerService()
-    route_plan = await planner.plan_route(
+    # Plan route; it geocodes companies missing coordinates, saved below
+    ungeocoded = [lead.company for lead in valid_leads if not (lead.company.latitude and lead.company.longitude)]
+    route_plan = await route_planner.plan_route(
         leads=valid_leads,
         start_location=request.start_location,
         optimize=request.optimize
     )
 
-    # Log activity for each lead
-    for lead in valid_leads:
-        activity = LeadActivity(
-            lead_id=lead.id,
-            activity_type="route_planned",
-            description="Included in route plan"
-        )
-        db.add(activity)
+    # Log activity for each lead, as one multi-row INSERT
+    await db.execute(insert(LeadActivity), [
+        {
+            "lead_id": lead.id,
+            "activity_type": "route_planned",
+            "description": "Included in route plan"
+        }
+        for lead in valid_leads
+    ])
+    await db.commit()
 
-    db.commit()
+    # Lead responses embed the company, coordinates included
+    if any(company.latitude and company.longitude for company in ungeocoded):
+        await cache.bump_generation(cache.LEADS)
 
     return route_plan
 
@@ -1,33 +1,46 @@
 """API endpoints for job search"""
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+from app.celery_app import celery_app
 from app.core.database import get_db
+from app.core import cache
 from app.schemas.lead import (
     JobSearchRequest, SearchCriteriaCreate,
     SearchCriteriaResponse, JobPostingResponse
 )
 from app.models.lead import SearchCriteria
-from app.services.job_scraper import JobScraperService
+from app.tasks import execute_search_task, search_status_key
 
 router = APIRouter()
 
 
+async def _start_search(search_request: JobSearchRequest) -> str:
+    """
+    Queue a job search on the Celery workers and return its task ID
+    Publishing to the broker is blocking socket I/O, so it runs off the event loop
+    """
+    task = await run_in_threadpool(execute_search_task.delay, search_request.model_dump())
+    return task.id
+
+
+# Celery states reported to clients
+SEARCH_STATUSES = {
+    "SUCCESS": "completed",
+    "FAILURE": "failed",
+    "REVOKED": "cancelled",
+}
+
+
 @router.post("/jobs", response_model=dict)
-async def search_jobs(
-    search_request: JobSearchRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
-):
+async def search_jobs(search_request: JobSearchRequest):
     """
     Search for jobs on Indeed and ZipRecruiter
-    This is an async operation that runs in the background
+    This is an async operation that runs on the Celery workers
     """
-    scraper = JobScraperService(db)
-
-    # Start background task
-    task_id = scraper.start_search(search_request)
-    background_tasks.add_task(scraper.execute_search, task_id, search_request)
+    task_id = await _start_search(search_request)
 
     return {
         "message": "Job search started",
@@ -38,41 +51,57 @@ async def search_jobs(
 
 @router.get("/jobs/status/{task_id}")
 async def get_search_status(task_id: str):
-    """Get the status of a job search task"""
-    # This would check Redis or Celery for task status
-    # For now, return a placeholder
+    """
+    Get the status of a job search task
+    The task publishes its own status; Celery is only asked once that expires
+    """
+    cached = await cache.get_raw(search_status_key(task_id))
+    if cached:
+        return Response(content=cached, media_type="application/json")
+
+    result = celery_app.AsyncResult(task_id)
+    state = await run_in_threadpool(lambda: result.state)
+
     return {
         "task_id": task_id,
-        "status": "completed",
-        "results_count": 0
+        "status": SEARCH_STATUSES.get(state, "processing"),
+        "results_count": result.result if state == "SUCCESS" else 0
     }
 
 
 @router.post("/criteria", response_model=SearchCriteriaResponse, status_code=201)
-async def save_search_criteria(criteria: SearchCriteriaCreate, db: Session = Depends(get_db)):
+async def save_search_criteria(criteria: SearchCriteriaCreate, db: AsyncSession = Depends(get_db)):
     """Save search criteria for reuse"""
     db_criteria = SearchCriteria(**criteria.model_dump())
     db.add(db_criteria)
-    db.commit()
-    db.refresh(db_criteria)
+    await db.commit()
+    await cache.bump_generation(cache.SEARCH_CRITERIA)
+    await db.refresh(db_criteria)
 
     return db_criteria
 
 
 @router.get("/criteria", response_model=List[SearchCriteriaResponse])
-async def get_saved_criteria(db: Session = Depends(get_db)):
+async def get_saved_criteria(db: AsyncSession = Depends(get_db)):
     """Get all saved search criteria"""
-    criteria = db.query(SearchCriteria).filter(
-        SearchCriteria.is_active == True
-    ).order_by(SearchCriteria.created_at.desc()).all()
+    async def load():
+        result = await db.execute(
+            select(SearchCriteria)
+            .where(SearchCriteria.is_active == True)
+            .order_by(SearchCriteria.created_at.desc())
+        )
+        return [
+            SearchCriteriaResponse.model_validate(criteria).model_dump(mode="json")
+            for criteria in result.scalars()
+        ]
 
-    return criteria
+    return await cache.cached_response(cache.SEARCH_CRITERIA, "active", load)
 
 
 @router.get("/criteria/{criteria_id}", response_model=SearchCriteriaResponse)
-async def get_search_criteria(criteria_id: int, db: Session = Depends(get_db)):
+async def get_search_criteria(criteria_id: int, db: AsyncSession = Depends(get_db)):
     """Get specific search criteria"""
-    criteria = db.query(SearchCriteria).filter(SearchCriteria.id == criteria_id).first()
+    criteria = await db.get(SearchCriteria, criteria_id)
 
     if not criteria:
         raise HTTPException(status_code=404, detail="Search criteria not found")
@@ -83,11 +112,10 @@ async def get_search_criteria(criteria_id: int, db: Session = Depends(get_db)):
 @router.post("/criteria/{criteria_id}/run")
 async def run_saved_search(
     criteria_id: int,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Run a saved search criteria"""
-    criteria = db.query(SearchCriteria).filter(SearchCriteria.id == criteria_id).first()
+    criteria = await db.get(SearchCriteria, criteria_id)
 
     if not criteria:
         raise HTTPException(status_code=404, detail="Search criteria not found")
@@ -105,14 +133,13 @@ async def run_saved_search(
         search_ziprecruiter=criteria.search_ziprecruiter
     )
 
-    scraper = JobScraperService(db)
-    task_id = scraper.start_search(search_request)
-    background_tasks.add_task(scraper.execute_search, task_id, search_request)
+    task_id = await _start_search(search_request)
 
     # Update last_run_at
     from datetime import datetime
     criteria.last_run_at = datetime.now()
-    db.commit()
+    await db.commit()
+    await cache.bump_generation(cache.SEARCH_CRITERIA)
 
     return {
         "message": "Search started",
@@ -122,12 +149,13 @@ async def run_saved_search(
 
 
 @router.delete("/criteria/{criteria_id}", status_code=204)
-async def delete_search_criteria(criteria_id: int, db: Session = Depends(get_db)):
+async def delete_search_criteria(criteria_id: int, db: AsyncSession = Depends(get_db)):
     """Delete search criteria"""
-    criteria = db.query(SearchCriteria).filter(SearchCriteria.id == criteria_id).first()
+    criteria = await db.get(SearchCriteria, criteria_id)
 
     if not criteria:
         raise HTTPException(status_code=404, detail="Search criteria not found")
 
-    db.delete(criteria)
-    db.commit()
+    await db.delete(criteria)
+    await db.commit()
+    await cache.bump_generation(cache.SEARCH_CRITERIA)
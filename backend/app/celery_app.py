@@ -18,6 +18,12 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutes
     result_expires=3600,  # 1 hour
+    # Long scrapes must not hold queued tasks hostage on a busy worker
+    worker_prefetch_multiplier=1,
+    # Ack after completion so a crashed or OOM-killed worker's task is redelivered
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_max_tasks_per_child=1000,
 )
 
 if __name__ == '__main__':
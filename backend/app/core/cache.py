@@ -0,0 +1,143 @@
+"""Redis connection for application-level caching"""
+import orjson
+from typing import Any, Awaitable, Callable, Dict, Optional
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+import redis
+import redis.asyncio as aioredis
+from loguru import logger
+from redis.exceptions import RedisError
+from app.core.config import settings
+
+# Connections are opened lazily from the client's pool on first use
+redis_client = aioredis.from_url(settings.REDIS_URL)
+
+# Celery workers run outside the API's event loop and use a blocking client
+sync_redis_client = redis.Redis.from_url(settings.REDIS_URL)
+
+# Namespaces for cached API reads, invalidated as a whole on writes
+LEADS = "leads"
+SEARCH_CRITERIA = "criteria"
+
+
+async def get_raw(key: str) -> Optional[bytes]:
+    """Return a cached value's bytes, treating Redis errors as a cache miss"""
+    try:
+        return await redis_client.get(key)
+    except RedisError as e:
+        logger.warning(f"Cache unavailable: {e}")
+        return None
+
+
+async def get_json(key: str) -> Optional[Any]:
+    """Return a cached JSON value, treating Redis errors as a cache miss"""
+    cached = await get_raw(key)
+    return orjson.loads(cached) if cached else None
+
+
+async def set_json(key: str, value: Any, ttl_seconds: int):
+    """Store a JSON value with a TTL; caching is best-effort"""
+    try:
+        await redis_client.setex(key, ttl_seconds, orjson.dumps(value, default=str))
+    except RedisError as e:
+        logger.warning(f"Cache unavailable: {e}")
+
+
+def set_json_sync(key: str, value: Any, ttl_seconds: int):
+    """set_json for code running outside an event loop"""
+    try:
+        sync_redis_client.setex(key, ttl_seconds, orjson.dumps(value, default=str))
+    except RedisError as e:
+        logger.warning(f"Cache unavailable: {e}")
+
+
+async def delete(*keys: str):
+    """Drop cached values; failures leave them to expire on their TTL"""
+    try:
+        await redis_client.delete(*keys)
+    except RedisError as e:
+        logger.warning(f"Cache unavailable: {e}")
+
+
+def _generation_key(namespace: str) -> str:
+    return f"gen:{namespace}"
+
+
+async def get_generation(namespace: str) -> Optional[int]:
+    """Current generation of a namespace, or None when Redis is unavailable"""
+    try:
+        generation = await redis_client.get(_generation_key(namespace))
+    except RedisError as e:
+        logger.warning(f"Cache unavailable: {e}")
+        return None
+
+    return int(generation or 0)
+
+
+async def bump_generation(*namespaces: str):
+    """
+    Invalidate everything cached under these namespaces
+    Keys embed the generation, so old entries are orphaned and expire on their TTL
+    """
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for namespace in namespaces:
+                pipe.incr(_generation_key(namespace))
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Cache unavailable: {e}")
+
+
+def bump_generation_sync(*namespaces: str):
+    """bump_generation for code running outside an event loop"""
+    try:
+        with sync_redis_client.pipeline(transaction=False) as pipe:
+            for namespace in namespaces:
+                pipe.incr(_generation_key(namespace))
+            pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Cache unavailable: {e}")
+
+
+async def cached_response(
+    namespace: str,
+    key: str,
+    load: Callable[[], Awaitable[Any]],
+    headers: Optional[Callable[[Any], Dict[str, str]]] = None
+) -> Response:
+    """
+    Read-through cache for a JSON endpoint, storing the encoded body
+    Hits return the cached bytes as-is, skipping validation and encoding.
+    headers() derives response headers from the loaded value; they are
+    cached beside the body since hits never decode it.
+    Falls back to load() alone when the namespace generation can't be read,
+    so a Redis outage never serves entries that missed an invalidation
+    """
+    generation = await get_generation(namespace)
+    if generation is None:
+        value = await load()
+        return ORJSONResponse(value, headers=headers(value) if headers else None)
+
+    full_key = f"{namespace}:{generation}:{key}"
+    try:
+        entry = await redis_client.hgetall(full_key)
+    except RedisError as e:
+        logger.warning(f"Cache unavailable: {e}")
+        entry = None
+
+    if entry:
+        body = entry[b"body"]
+        response_headers = orjson.loads(entry[b"headers"])
+    else:
+        value = await load()
+        body = orjson.dumps(value)
+        response_headers = headers(value) if headers else {}
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hset(full_key, mapping={"body": body, "headers": orjson.dumps(response_headers)})
+                pipe.expire(full_key, settings.CACHE_TTL_SECONDS)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Cache unavailable: {e}")
+
+    return Response(content=body, media_type="application/json", headers=response_headers)
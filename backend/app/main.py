@@ -1,13 +1,31 @@
 """Main FastAPI application"""
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.core.config import settings
+from app.api.pagination import NEXT_CURSOR_HEADER, TOTAL_ESTIMATE_HEADER
 from app.api import leads, companies, contacts, jobs, search, integrations, content, routes, import_tools
+from app.services.enrichment import enrichment_service
+from app.services.enrichment_free import free_enrichment_service
+from app.services.route_planner import route_planner
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Shared services hold pooled HTTP clients
+    await enrichment_service.aclose()
+    await free_enrichment_service.aclose()
+    await route_planner.aclose()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="Automated Sales Lead Generation Tool"
+    description="Automated Sales Lead Generation Tool",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -17,6 +35,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_ESTIMATE_HEADER],
 )
 
 # Include routers
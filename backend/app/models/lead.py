@@ -1,11 +1,28 @@
 """Database models for leads and related entities"""
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text, ForeignKey, JSON, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text, ForeignKey, JSON, Index, DDL, Computed, event, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
 
 
+# Trigram operator classes used by the GIN search indexes below
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
+def trigram_index(name: str, column: Column) -> Index:
+    """GIN trigram index on lower(column) so '%term%' filters avoid seq scans"""
+    expr = func.lower(column).label(name)
+    return Index(name, expr, postgresql_using="gin", postgresql_ops={name: "gin_trgm_ops"})
+
+
+def search_vector(*columns: str) -> Column:
+    """Stored english tsvector over the given text columns (deferred, query-only)"""
+    document = " || ' ' || ".join(f"coalesce({col}, '')" for col in columns)
+    return deferred(Column(TSVECTOR, Computed(f"to_tsvector('english', {document})", persisted=True)))
+
+
 class ContactMethod(str, enum.Enum):
     """Contact method types"""
     CALL = "call"
@@ -56,6 +73,9 @@ class Company(Base):
     annual_revenue = Column(String)
     technologies = Column(JSON)  # List of technologies used
 
+    # Full-text search
+    tsv = search_vector("name", "description")
+
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -66,6 +86,14 @@ class Company(Base):
     contacts = relationship("Contact", back_populates="company")
     leads = relationship("Lead", back_populates="company")
 
+    __table_args__ = (
+        trigram_index("ix_companies_name_trgm", name),
+        trigram_index("ix_companies_city_trgm", city),
+        trigram_index("ix_companies_state_trgm", state),
+        Index("ix_companies_tsv", tsv, postgresql_using="gin"),
+        Index("ix_companies_domain_lower", func.lower(domain), unique=True),
+    )
+
 
 class Contact(Base):
     """Contact person at a company"""
@@ -76,7 +104,13 @@ class Contact(Base):
 
     first_name = Column(String, nullable=False)
     last_name = Column(String, nullable=False)
-    full_name = Column(String, nullable=False, index=True)
+    # Derived by Postgres so every write path stays consistent
+    full_name = Column(
+        String,
+        Computed("trim(coalesce(first_name, '') || ' ' || coalesce(last_name, ''))", persisted=True),
+        nullable=False,
+        index=True
+    )
     title = Column(String)
     department = Column(String)
     email = Column(String, index=True)
@@ -99,6 +133,13 @@ class Contact(Base):
     company = relationship("Company", back_populates="contacts")
     leads = relationship("Lead", back_populates="contact")
 
+    __table_args__ = (
+        # Back get_contacts' (last_name, first_name, id) seek, with and
+        # without a company filter
+        Index("ix_contacts_company_name", company_id, last_name, first_name, id),
+        Index("ix_contacts_name", last_name, first_name, id),
+    )
+
 
 class JobPosting(Base):
     """Job posting from Indeed/ZipRecruiter"""
@@ -127,6 +168,9 @@ class JobPosting(Base):
     external_id = Column(String, unique=True, index=True)
     external_url = Column(String)
 
+    # Full-text search
+    tsv = search_vector("title", "description")
+
     # Dates
     posted_date = Column(DateTime(timezone=True))
     expires_date = Column(DateTime(timezone=True))
@@ -137,30 +181,46 @@ class JobPosting(Base):
     company = relationship("Company", back_populates="job_postings")
     leads = relationship("Lead", back_populates="job_posting")
 
+    __table_args__ = (
+        trigram_index("ix_job_postings_city_trgm", city),
+        trigram_index("ix_job_postings_state_trgm", state),
+        Index("ix_job_postings_tsv", tsv, postgresql_using="gin"),
+        # Back get_job_postings' (posted_date DESC, id DESC) seek, unfiltered
+        # and under its filters
+        Index("ix_job_postings_posted", posted_date.desc(), id.desc()),
+        Index("ix_job_postings_company_posted", company_id, posted_date.desc(), id.desc()),
+        Index("ix_job_postings_source_posted", source, posted_date.desc(), id.desc()),
+        Index(
+            "ix_job_postings_remote_posted", is_remote, posted_date.desc(), id.desc(),
+            postgresql_where=is_remote.is_(True)
+        ),
+    )
+
 
 class Lead(Base):
     """Main lead entity"""
     __tablename__ = "leads"
 
     id = Column(Integer, primary_key=True, index=True)
-    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
     contact_id = Column(Integer, ForeignKey("contacts.id"))
-    job_posting_id = Column(Integer, ForeignKey("job_postings.id"))
+    job_posting_id = Column(Integer, ForeignKey("job_postings.id"), index=True)
 
     # Lead info
-    status = Column(SQLEnum(LeadStatus), default=LeadStatus.NEW, index=True)
+    status = Column(SQLEnum(LeadStatus), default=LeadStatus.NEW)
     score = Column(Float)  # Lead scoring 0-100
 
     # Selected contact methods
     selected_methods = Column(JSON)  # List of selected ContactMethod values
 
-    # Generated content
-    call_script = Column(Text)
+    # Generated content and notes can run to kilobytes per lead, so they
+    # load only where undefer_group("content") asks for them
+    call_script = deferred(Column(Text), group="content")
     email_subject = Column(String)
-    email_body = Column(Text)
+    email_body = deferred(Column(Text), group="content")
 
     # User notes
-    notes = Column(Text)
+    notes = deferred(Column(Text), group="content")
     tags = Column(JSON)  # List of tags
 
     # Tracking
@@ -168,7 +228,7 @@ class Lead(Base):
     last_activity_at = Column(DateTime(timezone=True))
 
     # Metadata
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
@@ -177,6 +237,13 @@ class Lead(Base):
     job_posting = relationship("JobPosting", back_populates="leads")
     activities = relationship("LeadActivity", back_populates="lead")
 
+    __table_args__ = (
+        # Back get_leads' (created_at DESC, id DESC) seek, newest first
+        # without a sort, with and without a status filter
+        Index("ix_leads_status_created_at", status, created_at.desc(), id.desc()),
+        Index("ix_leads_created_at_id", created_at.desc(), id.desc()),
+    )
+
 
 class LeadActivity(Base):
     """Track all activities on a lead"""
@@ -187,13 +254,19 @@ class LeadActivity(Base):
 
     activity_type = Column(String, nullable=False)  # call, email, visit, note, status_change
     description = Column(Text)
-    metadata = Column(JSON)  # Additional data
+    # "metadata" is reserved on declarative models; the column keeps its name
+    extra_data = Column("metadata", JSON)  # Additional data
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     lead = relationship("Lead", back_populates="activities")
 
+    __table_args__ = (
+        # Backs get_lead_activities (one lead's history, newest first) without a sort
+        Index("ix_lead_activities_lead_created", lead_id, created_at.desc()),
+    )
+
 
 class SearchCriteria(Base):
     """Saved search criteria for job searches"""
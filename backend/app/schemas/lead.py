@@ -87,6 +87,20 @@ class ContactResponse(ContactBase):
     created_at: datetime
 
 
+class ContactSummaryResponse(BaseModel):
+    """Schema for contact list items"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    company_id: int
+    first_name: str
+    last_name: str
+    full_name: str
+    title: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+
+
 # Job Posting Schemas
 class JobPostingBase(BaseModel):
     """Base job posting schema"""
@@ -122,6 +136,25 @@ class JobPostingResponse(JobPostingBase):
     created_at: datetime
 
 
+class JobPostingSummaryResponse(BaseModel):
+    """Schema for job posting list items, without description and requirements"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    company_id: int
+    title: str
+    salary_range: Optional[str] = None
+    employment_type: Optional[str] = None
+    location: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    is_remote: bool = False
+    source: str
+    external_url: Optional[str] = None
+    posted_date: Optional[datetime] = None
+    created_at: datetime
+
+
 # Lead Schemas
 class LeadBase(BaseModel):
     """Base lead schema"""
@@ -170,6 +203,27 @@ class LeadResponse(LeadBase):
     job_posting: Optional[JobPostingResponse] = None
 
 
+class LeadListItem(BaseModel):
+    """Schema for lead list rows, flattened from a single joined query"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    company_id: int
+    contact_id: Optional[int] = None
+    job_posting_id: Optional[int] = None
+    status: LeadStatusEnum
+    score: Optional[float] = None
+    created_at: datetime
+
+    company_name: str
+    company_city: Optional[str] = None
+    company_state: Optional[str] = None
+    contact_full_name: Optional[str] = None
+    contact_title: Optional[str] = None
+    contact_email: Optional[str] = None
+    job_title: Optional[str] = None
+
+
 # Search Criteria Schemas
 class SearchCriteriaBase(BaseModel):
     """Base search criteria schema"""
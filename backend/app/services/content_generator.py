@@ -1,17 +1,110 @@
 """AI-powered content generation service"""
-from typing import Dict
+import asyncio
+import enum
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from app.models.lead import Lead
+from app.core import cache
 from app.core.config import settings
 from loguru import logger
-import openai
+from openai import AsyncOpenAI
+
+# Bump when prompts change so stale generations are not served from cache
+CONTENT_CACHE_VERSION = "v2"
+
+CONTENT_MODEL = "gpt-4"
+
+# Hot generations kept in-process in front of Redis
+LOCAL_CACHE_SIZE = 1024
+
+# Instructions are identical for every lead, so they go first as the system
+# message and the provider can reuse its prompt cache for that prefix; only the
+# user message (the lead's context) varies between requests
+CALL_SCRIPT_SYSTEM_PROMPT = """You are an expert sales coach specializing in B2B cold calling. Generate a brief, effective phone call script for a salesperson to use when cold calling the prospect described by the user.
+
+The script should:
+1. Have a strong opening that mentions their specific job posting or need
+2. Briefly introduce the caller and their value proposition
+3. Include 2-3 qualifying questions
+4. Have a clear call-to-action
+5. Be conversational and natural (not too scripted)
+6. Be brief (can be delivered in 2-3 minutes)"""
+CALL_SCRIPT_MAX_TOKENS = 500
+
+EMAIL_SYSTEM_PROMPT = """You are an expert B2B sales email copywriter. Generate a personalized cold email to the prospect described by the user, in the tone they ask for.
+
+Email requirements:
+- Subject line: Attention-grabbing and relevant (under 50 characters)
+- Body: 3-4 short paragraphs
+- Personalized based on their job posting or company
+- Clear value proposition
+- Specific call-to-action
+- Professional but not overly formal
+- Include a PS if relevant
+
+Generate the email in this format:
+SUBJECT: [subject line]
+
+BODY:
+[email body]"""
+EMAIL_MAX_TOKENS = 600
+
+# The "SUBJECT: ...\n\nBODY:\n..." layout EMAIL_SYSTEM_PROMPT asks for
+EMAIL_RESPONSE_RE = re.compile(r'^SUBJECT:(?P<subject>[^\n]*)(?:.*?^BODY:[^\n]*\n(?P<body>.*))?', re.MULTILINE | re.DOTALL)
+
+
+class BatchStatus(str, enum.Enum):
+    """Lifecycle of an OpenAI Batch API job"""
+    VALIDATING = "validating"
+    FAILED = "failed"
+    IN_PROGRESS = "in_progress"
+    FINALIZING = "finalizing"
+    COMPLETED = "completed"
+    EXPIRED = "expired"
+    CANCELLING = "cancelling"
+    CANCELLED = "cancelled"
 
 
 class ContentGeneratorService:
     """Service for generating sales content using AI"""
 
-    def __init__(self):
-        if settings.OPENAI_API_KEY:
-            openai.api_key = settings.OPENAI_API_KEY
+    def __init__(self, max_concurrent_requests: int = settings.LLM_CONCURRENCY):
+        self._client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
+
+        # Shared by every caller, so concurrent batches together stay under the cap
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
+
+        # Generations are immutable for a given key, so entries never go stale
+        self._local_cache: OrderedDict = OrderedDict()
+
+    async def generate_call_scripts_bulk(self, leads: List[Lead]) -> Dict[int, str]:
+        """Generate call scripts for many leads concurrently, keyed by lead ID"""
+        scripts = await asyncio.gather(*(self.generate_call_script(lead) for lead in leads), return_exceptions=True)
+
+        results = {}
+        for lead, script in zip(leads, scripts):
+            if isinstance(script, Exception):
+                logger.error(f"Error generating call script for lead {lead.id}: {script}")
+                script = self._get_fallback_call_script(lead)
+            results[lead.id] = script
+
+        return results
+
+    async def generate_emails_bulk(self, leads: List[Lead], tone: str = "professional") -> Dict[int, Dict[str, str]]:
+        """Generate emails for many leads concurrently, keyed by lead ID"""
+        emails = await asyncio.gather(*(self.generate_email(lead, tone) for lead in leads), return_exceptions=True)
+
+        results = {}
+        for lead, email in zip(leads, emails):
+            if isinstance(email, Exception):
+                logger.error(f"Error generating email for lead {lead.id}: {email}")
+                email = self._get_fallback_email(lead)
+            results[lead.id] = email
+
+        return results
 
     async def generate_call_script(self, lead: Lead) -> str:
         """
@@ -20,34 +113,18 @@ class ContentGeneratorService:
         # Build context about the lead
         context = self._build_lead_context(lead)
 
-        prompt = f"""You are a professional sales coach. Generate a brief, effective phone call script for a salesperson to use when cold calling this prospect.
-
-Context:
-{context}
-
-The script should:
-1. Have a strong opening that mentions their specific job posting or need
-2. Briefly introduce the caller and their value proposition
-3. Include 2-3 qualifying questions
-4. Have a clear call-to-action
-5. Be conversational and natural (not too scripted)
-6. Be brief (can be delivered in 2-3 minutes)
+        prompt = f"Context:\n{context}\n\nGenerate the call script now:"
 
-Generate the call script now:"""
+        if self._client:
+            cache_key = self._cache_key("call_script", context)
+            cached = await self._get_cached(cache_key)
+            if cached is not None:
+                return cached
 
-        if settings.OPENAI_API_KEY:
             try:
-                response = await openai.ChatCompletion.acreate(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": "You are an expert sales coach specializing in B2B cold calling."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=500,
-                    temperature=0.7
-                )
-
-                return response.choices[0].message.content.strip()
+                script = await self._complete(CALL_SCRIPT_SYSTEM_PROMPT, prompt, max_tokens=CALL_SCRIPT_MAX_TOKENS)
+                await self._set_cached(cache_key, script)
+                return script
 
             except Exception as e:
                 logger.error(f"Error generating call script: {e}")
@@ -62,41 +139,19 @@ Generate the call script now:"""
         """
         context = self._build_lead_context(lead)
 
-        prompt = f"""You are an expert B2B sales email writer. Generate a personalized cold email to this prospect.
-
-Context:
-{context}
-
-Email requirements:
-- Tone: {tone}
-- Subject line: Attention-grabbing and relevant (under 50 characters)
-- Body: 3-4 short paragraphs
-- Personalized based on their job posting or company
-- Clear value proposition
-- Specific call-to-action
-- Professional but not overly formal
-- Include a PS if relevant
-
-Generate the email in this format:
-SUBJECT: [subject line]
+        prompt = self._email_prompt(context, tone)
 
-BODY:
-[email body]"""
+        if self._client:
+            cache_key = self._cache_key(f"email:{tone}", context)
+            cached = await self._get_cached(cache_key)
+            if cached is not None:
+                return cached
 
-        if settings.OPENAI_API_KEY:
             try:
-                response = await openai.ChatCompletion.acreate(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": "You are an expert B2B sales email copywriter."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=600,
-                    temperature=0.7
-                )
-
-                content = response.choices[0].message.content.strip()
-                return self._parse_email_response(content)
+                content = await self._complete(EMAIL_SYSTEM_PROMPT, prompt, max_tokens=EMAIL_MAX_TOKENS)
+                email = self._parse_email_response(content)
+                await self._set_cached(cache_key, email)
+                return email
 
             except Exception as e:
                 logger.error(f"Error generating email: {e}")
@@ -105,6 +160,124 @@ BODY:
             logger.warning("OpenAI API key not configured, using fallback email")
             return self._get_fallback_email(lead)
 
+    async def submit_email_batch(self, leads: List[Lead], tone: str = "professional") -> str:
+        """
+        Queue emails for many leads on the OpenAI Batch API and return the batch ID
+        Batches finish within 24h at about half the per-token price of live calls,
+        for bulk runs that don't need results right away
+        """
+        if not self._client:
+            raise ValueError("OpenAI API key not configured")
+
+        lines = (
+            json.dumps({
+                "custom_id": str(lead.id),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._chat_request(
+                    EMAIL_SYSTEM_PROMPT,
+                    self._email_prompt(self._build_lead_context(lead), tone),
+                    EMAIL_MAX_TOKENS
+                )
+            })
+            for lead in leads
+        )
+
+        batch_input = await self._client.files.create(
+            file=("emails.jsonl", "\n".join(lines).encode()),
+            purpose="batch"
+        )
+        batch = await self._client.batches.create(
+            input_file_id=batch_input.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+
+        logger.info(f"Submitted email batch {batch.id} for {len(leads)} leads")
+        return batch.id
+
+    async def poll_email_batch(self, batch_id: str) -> Tuple[BatchStatus, Optional[Dict[int, Dict[str, str]]]]:
+        """
+        Check an email batch, returning its status and, once completed, emails by lead ID
+        Leads whose request failed are left out, so callers can fall back for them
+        """
+        if not self._client:
+            raise ValueError("OpenAI API key not configured")
+
+        batch = await self._client.batches.retrieve(batch_id)
+        status = BatchStatus(batch.status)
+
+        if status != BatchStatus.COMPLETED or not batch.output_file_id:
+            return status, None
+
+        output = await self._client.files.content(batch.output_file_id)
+
+        emails = {}
+        for line in output.text.splitlines():
+            result = json.loads(line)
+            response = result.get("response") or {}
+
+            if result.get("error") or response.get("status_code") != 200:
+                logger.error(f"Batch {batch_id} failed for lead {result.get('custom_id')}: {result.get('error')}")
+                continue
+
+            content = response["body"]["choices"][0]["message"]["content"].strip()
+            emails[int(result["custom_id"])] = self._parse_email_response(content)
+
+        return status, emails
+
+    def _email_prompt(self, context: str, tone: str) -> str:
+        """Per-lead part of the email prompt, shared by live and Batch API generation"""
+        return f"Context:\n{context}\n\nTone: {tone}\n\nGenerate the email now:"
+
+    def _chat_request(self, system_prompt: str, prompt: str, max_tokens: int) -> Dict:
+        """Chat completion parameters, as sent live or as a Batch API request body"""
+        return {
+            "model": CONTENT_MODEL,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": max_tokens,
+            "temperature": 0.7
+        }
+
+    async def _complete(self, system_prompt: str, prompt: str, max_tokens: int) -> str:
+        """Run one chat completion, waiting for a free slot under the concurrency cap"""
+        async with self._semaphore:
+            response = await self._client.chat.completions.create(
+                **self._chat_request(system_prompt, prompt, max_tokens)
+            )
+
+        return response.choices[0].message.content.strip()
+
+    def _cache_key(self, kind: str, context: str) -> str:
+        """Cache key for generated content, keyed by model and the exact prompt context"""
+        digest = hashlib.blake2b(context.encode(), digest_size=16).hexdigest()
+        return f"content:{CONTENT_CACHE_VERSION}:{CONTENT_MODEL}:{kind}:{digest}"
+
+    async def _get_cached(self, key: str):
+        """Look up generated content locally, then in Redis"""
+        if key in self._local_cache:
+            self._local_cache.move_to_end(key)
+            return self._local_cache[key]
+
+        cached = await cache.get_json(key)
+        if cached is not None:
+            self._remember(key, cached)
+        return cached
+
+    async def _set_cached(self, key: str, value):
+        self._remember(key, value)
+        await cache.set_json(key, value, settings.CONTENT_CACHE_TTL_SECONDS)
+
+    def _remember(self, key: str, value):
+        """Keep a generation in the in-process LRU, evicting the least recently used"""
+        self._local_cache[key] = value
+        self._local_cache.move_to_end(key)
+        if len(self._local_cache) > LOCAL_CACHE_SIZE:
+            self._local_cache.popitem(last=False)
+
     def _build_lead_context(self, lead: Lead) -> str:
         """Build context string about the lead for AI prompts"""
         context_parts = []
@@ -191,21 +364,9 @@ P.S. I've worked with several companies in [THEIR INDUSTRY] and would be happy t
 
     def _parse_email_response(self, content: str) -> Dict[str, str]:
         """Parse AI-generated email into subject and body"""
-        lines = content.strip().split('\n')
-
-        subject = ""
-        body_lines = []
-        in_body = False
-
-        for line in lines:
-            if line.startswith("SUBJECT:"):
-                subject = line.replace("SUBJECT:", "").strip()
-            elif line.startswith("BODY:"):
-                in_body = True
-            elif in_body:
-                body_lines.append(line)
-
-        body = '\n'.join(body_lines).strip()
+        match = EMAIL_RESPONSE_RE.search(content)
+        subject = match.group('subject').strip() if match else ""
+        body = (match.group('body') or "").strip() if match else ""
 
         # Fallback if parsing failed
         if not subject:
@@ -217,3 +378,7 @@ P.S. I've worked with several companies in [THEIR INDUSTRY] and would be happy t
             "subject": subject,
             "body": body
         }
+
+
+# Shared instance; the service holds no per-request state
+content_generator = ContentGeneratorService()
@@ -1,12 +1,24 @@
 """Deduplication and memory service"""
 import hashlib
-from typing import Optional, Set
+from typing import Callable, Iterable, Optional, Set
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session, undefer
 from app.models.lead import Company, JobPosting, Contact, Lead
 from app.core.config import settings
 import redis
 from loguru import logger
+import time
+
+# Cached answers to "seen before?"; a miss is only cached briefly since
+# the entity may be created at any moment
+SEEN = b"1"
+UNSEEN = b"0"
+UNSEEN_TTL_SECONDS = 5 * 60
+
+# Single-flight lock for a cold key's database lookup, and how long others wait on it
+LOOKUP_LOCK_SECONDS = 5
+LOOKUP_POLL_ATTEMPTS = 6
 
 
 class DeduplicationService:
@@ -20,82 +32,157 @@ class DeduplicationService:
         self.redis = redis_client or redis.from_url(settings.REDIS_URL)
         self.ttl_seconds = settings.DEDUPLICATION_TTL_DAYS * 24 * 60 * 60
 
+    @staticmethod
+    def _company_key(domain: str) -> str:
+        return f"seen:company:{domain}"
+
+    @staticmethod
+    def _job_key(external_id: str, source: str) -> str:
+        return f"seen:job:{source}:{external_id}"
+
+    @staticmethod
+    def _contact_key(email: str) -> str:
+        return f"seen:contact:{email}"
+
     def is_company_seen(self, domain: str) -> bool:
         """Check if we've seen this company before"""
         if not domain:
             return False
 
-        # Check Redis first (fast)
-        redis_key = f"seen:company:{domain}"
-        if self.redis.exists(redis_key):
-            logger.debug(f"Company {domain} found in Redis cache")
-            return True
+        return self._lookup_seen(
+            self._company_key(domain),
+            lambda: self.db.query(Company.id).filter(Company.domain == domain).first() is not None
+        )
+
+    def filter_unseen_companies(self, domains: Iterable[str]) -> Set[str]:
+        """Bulk is_company_seen: return the domains that have not been seen before"""
+        return self._filter_unseen(domains, self._company_key, Company.domain)
+
+    def filter_unseen_job_postings(self, external_ids: Iterable[str], source: str) -> Set[str]:
+        """Bulk is_job_posting_seen: return the external IDs from source not seen before"""
+        return self._filter_unseen(
+            external_ids,
+            lambda external_id: self._job_key(external_id, source),
+            JobPosting.external_id,
+            JobPosting.source == source
+        )
 
-        # Check database (slower but persistent)
-        company = self.db.query(Company).filter(Company.domain == domain).first()
-        if company:
-            # Add to Redis for future fast lookups
-            self.redis.setex(redis_key, self.ttl_seconds, "1")
-            logger.debug(f"Company {domain} found in database")
-            return True
+    def filter_unseen_contacts(self, emails: Iterable[str]) -> Set[str]:
+        """Bulk is_contact_seen: return the emails that have not been seen before"""
+        return self._filter_unseen(emails, self._contact_key, Contact.email)
 
-        return False
+    def _filter_unseen(self, values: Iterable[str], redis_key: Callable[[str], str], column, *criteria) -> Set[str]:
+        """
+        Shared bulk seen-check: one MGET, then one IN query for the cache misses,
+        however many values are checked
+        """
+        values = list({value for value in values if value})
+        if not values:
+            return set()
+
+        cached = self.redis.mget([redis_key(value) for value in values])
+        unseen = {value for value, hit in zip(values, cached) if hit == UNSEEN}
+        missing = [value for value, hit in zip(values, cached) if hit is None]
+        logger.opt(lazy=True).debug(
+            "Seen-check batch of {}: {} cached unseen, {} to look up",
+            lambda: len(values), lambda: len(unseen), lambda: len(missing)
+        )
+        if not missing:
+            return unseen
+
+        known = {
+            value for (value,) in
+            self.db.query(column).filter(column.in_(missing), *criteria)
+        }
+        new = set(missing) - known
 
-    def is_job_posting_seen(self, external_id: str, source: str) -> bool:
-        """Check if we've seen this job posting before"""
-        # Check Redis first
-        redis_key = f"seen:job:{source}:{external_id}"
-        if self.redis.exists(redis_key):
-            return True
-
-        # Check database
-        job = self.db.query(JobPosting).filter(
-            JobPosting.external_id == external_id,
-            JobPosting.source == source
-        ).first()
+        # Cache both answers for future fast lookups
+        self._cache_lookups([redis_key(value) for value in known], [redis_key(value) for value in new])
 
-        if job:
-            # Add to Redis
-            self.redis.setex(redis_key, self.ttl_seconds, "1")
-            return True
+        return unseen | new
 
-        return False
+    def is_job_posting_seen(self, external_id: str, source: str) -> bool:
+        """Check if we've seen this job posting before"""
+        return self._lookup_seen(
+            self._job_key(external_id, source),
+            lambda: self.db.query(JobPosting.id).filter(
+                JobPosting.external_id == external_id,
+                JobPosting.source == source
+            ).first() is not None
+        )
 
     def is_contact_seen(self, email: str) -> bool:
         """Check if we've seen this contact before"""
         if not email:
             return False
 
-        # Check Redis first
-        redis_key = f"seen:contact:{email}"
-        if self.redis.exists(redis_key):
-            return True
-
-        # Check database
-        contact = self.db.query(Contact).filter(Contact.email == email).first()
-        if contact:
-            # Add to Redis
-            self.redis.setex(redis_key, self.ttl_seconds, "1")
-            return True
+        return self._lookup_seen(
+            self._contact_key(email),
+            lambda: self.db.query(Contact.id).filter(Contact.email == email).first() is not None
+        )
 
-        return False
+    def _lookup_seen(self, redis_key: str, in_database: Callable[[], bool]) -> bool:
+        """
+        Check Redis first (fast), then the database (slower but persistent)
+        Both answers are cached, misses only briefly. Concurrent checks of the
+        same cold key are single-flighted: one caller queries the database
+        while the rest poll for the answer it caches.
+        """
+        cached = self.redis.get(redis_key)
+        if cached is not None:
+            return cached == SEEN
+
+        lock_key = f"lock:{redis_key}"
+        locked = self.redis.set(lock_key, "1", nx=True, ex=LOOKUP_LOCK_SECONDS)
+        if not locked:
+            for attempt in range(LOOKUP_POLL_ATTEMPTS):
+                time.sleep(0.02 * 2 ** attempt)
+                cached = self.redis.get(redis_key)
+                if cached is not None:
+                    return cached == SEEN
+            # The lock holder is slow or gone; answer from the database ourselves
+
+        try:
+            seen = in_database()
+            self._cache_lookups([redis_key] if seen else [], [] if seen else [redis_key])
+        finally:
+            if locked:
+                self.redis.delete(lock_key)
+
+        return seen
 
     def mark_company_seen(self, domain: str):
         """Mark a company as seen"""
         if domain:
-            redis_key = f"seen:company:{domain}"
-            self.redis.setex(redis_key, self.ttl_seconds, "1")
+            redis_key = self._company_key(domain)
+            self.redis.setex(redis_key, self.ttl_seconds, SEEN)
+
+    def mark_companies_seen_bulk(self, domains: Iterable[str]):
+        """Mark many companies as seen in one pipelined round trip"""
+        self._mark_seen_bulk(self._company_key(domain) for domain in domains if domain)
+
+    def _mark_seen_bulk(self, redis_keys: Iterable[str]):
+        self._cache_lookups(redis_keys, [])
+
+    def _cache_lookups(self, seen_keys: Iterable[str], unseen_keys: Iterable[str]):
+        """Cache seen and not-yet-seen answers in one pipelined round trip"""
+        with self.redis.pipeline(transaction=False) as pipe:
+            for redis_key in seen_keys:
+                pipe.setex(redis_key, self.ttl_seconds, SEEN)
+            for redis_key in unseen_keys:
+                pipe.setex(redis_key, UNSEEN_TTL_SECONDS, UNSEEN)
+            pipe.execute()
 
     def mark_job_posting_seen(self, external_id: str, source: str):
         """Mark a job posting as seen"""
-        redis_key = f"seen:job:{source}:{external_id}"
-        self.redis.setex(redis_key, self.ttl_seconds, "1")
+        redis_key = self._job_key(external_id, source)
+        self.redis.setex(redis_key, self.ttl_seconds, SEEN)
 
     def mark_contact_seen(self, email: str):
         """Mark a contact as seen"""
         if email:
-            redis_key = f"seen:contact:{email}"
-            self.redis.setex(redis_key, self.ttl_seconds, "1")
+            redis_key = self._contact_key(email)
+            self.redis.setex(redis_key, self.ttl_seconds, SEEN)
 
     def get_duplicate_leads(self) -> list:
         """
@@ -107,11 +194,13 @@ class DeduplicationService:
         # Query for leads with same company_id and contact_id
         duplicates = []
 
-        # Find leads with same company and contact
+        # Find leads with same company and contact, collecting each group's
+        # IDs in the same query rather than re-querying per group
         from sqlalchemy import func
         company_contact_dupes = self.db.query(
             Lead.company_id,
             Lead.contact_id,
+            func.array_agg(aggregate_order_by(Lead.id, Lead.id)).label('lead_ids'),
             func.count(Lead.id).label('count')
         ).filter(
             Lead.contact_id.isnot(None)
@@ -123,14 +212,9 @@ class DeduplicationService:
         ).all()
 
         for dupe in company_contact_dupes:
-            leads = self.db.query(Lead).filter(
-                Lead.company_id == dupe.company_id,
-                Lead.contact_id == dupe.contact_id
-            ).all()
-
             duplicates.append({
                 'type': 'company_contact',
-                'leads': [lead.id for lead in leads],
+                'leads': dupe.lead_ids,
                 'count': dupe.count
             })
 
@@ -143,38 +227,45 @@ class DeduplicationService:
         - Combines notes and activities from secondary leads
         - Deletes secondary leads
         """
-        primary = self.db.query(Lead).filter(Lead.id == primary_lead_id).first()
+        primary = self.db.query(Lead).options(undefer(Lead.notes)).filter(Lead.id == primary_lead_id).first()
         if not primary:
             raise ValueError("Primary lead not found")
 
-        for secondary_id in secondary_lead_ids:
-            secondary = self.db.query(Lead).filter(Lead.id == secondary_id).first()
-            if not secondary:
-                continue
+        secondaries = self.db.query(Lead).options(undefer(Lead.notes)).filter(
+            Lead.id.in_(secondary_lead_ids)
+        ).all()
+        order = {lead_id: position for position, lead_id in enumerate(secondary_lead_ids)}
+        secondaries.sort(key=lambda lead: order[lead.id])
+
+        tags = list(primary.tags or [])
+        known_tags = set(tags)
 
+        for secondary in secondaries:
             # Merge notes
             if secondary.notes:
                 if primary.notes:
-                    primary.notes += f"\n\n--- Merged from Lead #{secondary_id} ---\n{secondary.notes}"
+                    primary.notes += f"\n\n--- Merged from Lead #{secondary.id} ---\n{secondary.notes}"
                 else:
                     primary.notes = secondary.notes
 
-            # Merge tags
-            if secondary.tags:
-                if not primary.tags:
-                    primary.tags = []
-                primary.tags.extend(tag for tag in secondary.tags if tag not in primary.tags)
+            # Merge tags, keeping first-seen order
+            for tag in secondary.tags or []:
+                if tag not in known_tags:
+                    known_tags.add(tag)
+                    tags.append(tag)
 
-            # Move activities to primary lead
-            from app.models.lead import LeadActivity
-            activities = self.db.query(LeadActivity).filter(
-                LeadActivity.lead_id == secondary_id
-            ).all()
+        # Reassign so the JSON column registers the change
+        if len(tags) != len(primary.tags or []):
+            primary.tags = tags
 
-            for activity in activities:
-                activity.lead_id = primary_lead_id
+        # Move activities to primary lead in one UPDATE, before their leads go
+        from app.models.lead import LeadActivity
+        self.db.query(LeadActivity).filter(
+            LeadActivity.lead_id.in_([secondary.id for secondary in secondaries])
+        ).update({LeadActivity.lead_id: primary_lead_id}, synchronize_session=False)
 
-            # Delete secondary lead
+        # Delete secondary leads
+        for secondary in secondaries:
             self.db.delete(secondary)
 
         self.db.commit()
@@ -186,22 +277,36 @@ class DeduplicationService:
         Note: Redis TTL handles this automatically, but this can be used
         for manual cleanup if needed
         """
-        # Get all keys with our prefix
-        patterns = ["seen:company:*", "seen:job:*", "seen:contact:*"]
+        # SCAN walks the keyspace incrementally instead of blocking Redis like KEYS
         deleted_count = 0
 
-        for pattern in patterns:
-            keys = self.redis.keys(pattern)
-            for key in keys:
-                # Check if TTL is expired
-                ttl = self.redis.ttl(key)
-                if ttl < 0:  # No expiration set
-                    self.redis.delete(key)
-                    deleted_count += 1
+        for keys in self._scan_batches("seen:*"):
+            with self.redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.ttl(key)
+                ttls = pipe.execute()
+
+            # No expiration set
+            stale = [key for key, ttl in zip(keys, ttls) if ttl < 0]
+            if stale:
+                self.redis.delete(*stale)
+                deleted_count += len(stale)
 
         logger.info(f"Cleaned up {deleted_count} cache entries")
         return deleted_count
 
+    def _scan_batches(self, pattern: str, batch_size: int = 500):
+        """Yield keys matching pattern in lists of up to batch_size, via SCAN"""
+        batch = []
+        for key in self.redis.scan_iter(match=pattern, count=1000):
+            batch.append(key)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
     def get_seen_stats(self) -> dict:
         """Get statistics about seen entities"""
         return {
@@ -209,5 +314,5 @@ class DeduplicationService:
             'jobs_seen': self.db.query(JobPosting).count(),
             'contacts_seen': self.db.query(Contact).count(),
             'leads_created': self.db.query(Lead).count(),
-            'cache_entries': len(self.redis.keys("seen:*"))
+            'cache_entries': sum(len(keys) for keys in self._scan_batches("seen:*"))
         }
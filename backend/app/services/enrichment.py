@@ -1,34 +1,43 @@
 """Company and contact enrichment service"""
+import asyncio
 from typing import List, Dict, Optional
 from app.models.lead import Company
 from app.core.config import settings
 import httpx
 from loguru import logger
 
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
 
 class EnrichmentService:
     """Service for enriching company and contact data"""
 
+    def __init__(self):
+        # One pooled client, so repeat calls to a provider reuse its connections
+        self._client = httpx.AsyncClient(timeout=10.0, limits=HTTP_LIMITS)
+
+    async def aclose(self):
+        await self._client.aclose()
+
     async def enrich_company(self, company: Company) -> Dict:
         """
         Enrich company data using multiple sources
         """
-        enriched_data = {}
-
-        # Try LinkedIn
+        # Query every configured provider at once; later ones win on conflicts
+        providers = []
         if settings.LINKEDIN_API_KEY:
-            linkedin_data = await self._enrich_from_linkedin(company)
-            enriched_data.update(linkedin_data)
-
-        # Try ZoomInfo
+            providers.append(self._enrich_from_linkedin(company))
         if settings.ZOOMINFO_API_KEY:
-            zoominfo_data = await self._enrich_from_zoominfo(company)
-            enriched_data.update(zoominfo_data)
-
-        # Try Apollo
+            providers.append(self._enrich_from_zoominfo(company))
         if settings.APOLLO_API_KEY:
-            apollo_data = await self._enrich_from_apollo(company)
-            enriched_data.update(apollo_data)
+            providers.append(self._enrich_from_apollo(company))
+
+        enriched_data = {}
+        for result in await asyncio.gather(*providers, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.error(f"Error enriching {company.name}: {result}")
+            else:
+                enriched_data.update(result)
 
         # If no APIs configured, use mock data
         if not enriched_data:
@@ -40,22 +49,21 @@ class EnrichmentService:
         """
         Discover contacts at a company
         """
-        contacts = []
-
-        # Try LinkedIn
+        # Query every configured provider at once, keeping their results in order
+        providers = []
         if settings.LINKEDIN_API_KEY:
-            linkedin_contacts = await self._discover_linkedin_contacts(company)
-            contacts.extend(linkedin_contacts)
-
-        # Try ZoomInfo
+            providers.append(self._discover_linkedin_contacts(company))
         if settings.ZOOMINFO_API_KEY:
-            zoominfo_contacts = await self._discover_zoominfo_contacts(company)
-            contacts.extend(zoominfo_contacts)
-
-        # Try Apollo
+            providers.append(self._discover_zoominfo_contacts(company))
         if settings.APOLLO_API_KEY:
-            apollo_contacts = await self._discover_apollo_contacts(company)
-            contacts.extend(apollo_contacts)
+            providers.append(self._discover_apollo_contacts(company))
+
+        contacts = []
+        for result in await asyncio.gather(*providers, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.error(f"Error discovering contacts for {company.name}: {result}")
+            else:
+                contacts.extend(result)
 
         # If no APIs configured, use mock data
         if not contacts:
@@ -106,29 +114,28 @@ class EnrichmentService:
             return {}
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.apollo.io/v1/organizations/enrich",
-                    headers={
-                        "Content-Type": "application/json",
-                        "Cache-Control": "no-cache",
-                        "X-Api-Key": settings.APOLLO_API_KEY
-                    },
-                    json={"domain": company.domain}
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    org = data.get('organization', {})
-
-                    return {
-                        'description': org.get('short_description'),
-                        'industry': org.get('industry'),
-                        'employee_count': org.get('estimated_num_employees'),
-                        'annual_revenue': org.get('estimated_annual_revenue'),
-                        'linkedin_url': org.get('linkedin_url'),
-                        'technologies': org.get('technologies', [])
-                    }
+            response = await self._client.post(
+                "https://api.apollo.io/v1/organizations/enrich",
+                headers={
+                    "Content-Type": "application/json",
+                    "Cache-Control": "no-cache",
+                    "X-Api-Key": settings.APOLLO_API_KEY
+                },
+                json={"domain": company.domain}
+            )
+
+            if response.status_code == 200:
+                data = response.json()
+                org = data.get('organization', {})
+
+                return {
+                    'description': org.get('short_description'),
+                    'industry': org.get('industry'),
+                    'employee_count': org.get('estimated_num_employees'),
+                    'annual_revenue': org.get('estimated_annual_revenue'),
+                    'linkedin_url': org.get('linkedin_url'),
+                    'technologies': org.get('technologies', [])
+                }
 
         except Exception as e:
             logger.error(f"Error enriching from Apollo: {e}")
@@ -155,38 +162,37 @@ class EnrichmentService:
             return []
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.apollo.io/v1/mixed_people/search",
-                    headers={
-                        "Content-Type": "application/json",
-                        "X-Api-Key": settings.APOLLO_API_KEY
-                    },
-                    json={
-                        "organization_domains": [company.domain],
-                        "person_titles": ["sales", "business development", "director", "manager", "vp"],
-                        "per_page": 10
+            response = await self._client.post(
+                "https://api.apollo.io/v1/mixed_people/search",
+                headers={
+                    "Content-Type": "application/json",
+                    "X-Api-Key": settings.APOLLO_API_KEY
+                },
+                json={
+                    "organization_domains": [company.domain],
+                    "person_titles": ["sales", "business development", "director", "manager", "vp"],
+                    "per_page": 10
+                }
+            )
+
+            if response.status_code == 200:
+                data = response.json()
+                people = data.get('people', [])
+
+                return [
+                    {
+                        'first_name': person.get('first_name'),
+                        'last_name': person.get('last_name'),
+                        'full_name': f"{person.get('first_name')} {person.get('last_name')}",
+                        'title': person.get('title'),
+                        'email': person.get('email'),
+                        'phone': person.get('phone_number'),
+                        'linkedin_url': person.get('linkedin_url'),
+                        'source': 'apollo',
+                        'confidence_score': 0.8
                     }
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    people = data.get('people', [])
-
-                    return [
-                        {
-                            'first_name': person.get('first_name'),
-                            'last_name': person.get('last_name'),
-                            'full_name': f"{person.get('first_name')} {person.get('last_name')}",
-                            'title': person.get('title'),
-                            'email': person.get('email'),
-                            'phone': person.get('phone_number'),
-                            'linkedin_url': person.get('linkedin_url'),
-                            'source': 'apollo',
-                            'confidence_score': 0.8
-                        }
-                        for person in people
-                    ]
+                    for person in people
+                ]
 
         except Exception as e:
             logger.error(f"Error discovering contacts from Apollo: {e}")
@@ -232,3 +238,7 @@ class EnrichmentService:
                 'confidence_score': 0.7
             }
         ]
+
+
+# Shared instance; holds the pooled HTTP client, closed on app shutdown
+enrichment_service = EnrichmentService()
@@ -1,10 +1,50 @@
 """Free enrichment service using public data sources"""
-from typing import Dict
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import unquote
 from app.models.lead import Company
 import httpx
 from loguru import logger
+from selectolax.lexbor import LexborHTMLParser
 import re
 
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+# Enough of a page for its <head> and visible contact details; the rest is
+# mostly scripts and styles that aren't worth downloading
+MAX_PAGE_BYTES = 256 * 1024
+
+# Matched against the page's visible text rather than its raw markup;
+# mailto: and tel: links are read from the parsed tree
+EMAIL_RE = re.compile(r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})')
+PHONE_RE = re.compile(r'(\+?1?[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})')
+
+# Common email patterns, most likely first
+EMAIL_TEMPLATES = (
+    "{fn}.{ln}@{d}",
+    "{fn}{ln}@{d}",
+    "{fi}{ln}@{d}",
+    "{fn}@{d}",
+    "{fn}{li}@{d}",
+    "{fi}.{ln}@{d}",
+    "{ln}.{fn}@{d}",
+)
+
+# Placeholder and no-reply addresses that aren't worth keeping as contacts
+TRAP_EMAIL_MARKERS = ('@example', '@domain', 'noreply')
+
+
+def _meta_content(tree: LexborHTMLParser, selector: str) -> Optional[str]:
+    node = tree.css_first(selector)
+    return node.attributes.get('content') if node else None
+
+
+def _link_targets(tree: LexborHTMLParser, scheme: str) -> Iterator[str]:
+    """Targets of the page's links with a scheme like mailto: or tel:, minus scheme and query"""
+    for node in tree.css(f'a[href^="{scheme}" i]'):
+        target = unquote(node.attributes.get('href') or '')[len(scheme):].split('?', 1)[0].strip()
+        if target:
+            yield target
+
 
 class FreeEnrichmentService:
     """
@@ -12,6 +52,13 @@ class FreeEnrichmentService:
     No API keys required!
     """
 
+    def __init__(self):
+        # One pooled client, so scrapes keep connections alive between calls
+        self._client = httpx.AsyncClient(timeout=10.0, limits=HTTP_LIMITS, follow_redirects=True)
+
+    async def aclose(self):
+        await self._client.aclose()
+
     async def enrich_company_free(self, company: Company) -> Dict:
         """
         Enrich company data using free public sources
@@ -46,58 +93,68 @@ class FreeEnrichmentService:
         data = {}
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(url, follow_redirects=True)
-
-                if response.status_code == 200:
-                    html = response.text
-
-                    # Extract meta description
-                    desc_match = re.search(r'<meta name="description" content="([^"]+)"', html, re.IGNORECASE)
-                    if desc_match:
-                        data['description'] = desc_match.group(1)[:500]
-
-                    # Extract Open Graph description
-                    og_desc = re.search(r'<meta property="og:description" content="([^"]+)"', html, re.IGNORECASE)
-                    if og_desc and not data.get('description'):
-                        data['description'] = og_desc.group(1)[:500]
-
-                    # Look for contact email in footer or contact info
-                    email_match = re.search(r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', html)
-                    if email_match:
-                        potential_email = email_match.group(1)
-                        # Avoid common trap emails
-                        if not any(x in potential_email.lower() for x in ['@example', '@domain', 'noreply']):
-                            data['contact_email'] = potential_email
-
-                    # Look for phone numbers
-                    phone_match = re.search(r'(\+?1?[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})', html)
-                    if phone_match:
-                        data['phone'] = phone_match.group(1)
+            status_code, html = await self._fetch_page(url)
+
+            if status_code == 200:
+                # One parse of the page; selectors replace repeated scans of the markup
+                tree = LexborHTMLParser(html)
+
+                # Meta description, falling back to Open Graph
+                description = (
+                    _meta_content(tree, 'meta[name="description" i]')
+                    or _meta_content(tree, 'meta[property="og:description" i]')
+                )
+                if description:
+                    data['description'] = description[:500]
+
+                text = tree.body.text(separator=' ') if tree.body else ''
+
+                # Look for contact email: mailto links first, since their
+                # addresses live in attributes the visible text leaves out
+                emails = [*_link_targets(tree, 'mailto:'), *(m.group(1) for m in EMAIL_RE.finditer(text))]
+                for potential_email in emails:
+                    # Avoid common trap emails
+                    if not any(x in potential_email.lower() for x in TRAP_EMAIL_MARKERS):
+                        data['contact_email'] = potential_email
+                        break
+
+                # Look for phone numbers, tel links first
+                phone = next(_link_targets(tree, 'tel:'), None)
+                if not phone:
+                    phone_match = PHONE_RE.search(text)
+                    phone = phone_match.group(1) if phone_match else None
+                if phone:
+                    data['phone'] = phone
 
         except Exception as e:
             logger.warning(f"Error scraping website {url}: {e}")
 
         return data
 
+    async def _fetch_page(self, url: str, **kwargs) -> Tuple[int, str]:
+        """
+        GET a page, streaming only its first MAX_PAGE_BYTES
+        Returns the status code and the decoded (possibly truncated) HTML
+        """
+        async with self._client.stream("GET", url, **kwargs) as response:
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) >= MAX_PAGE_BYTES:
+                    break
+
+            html = body[:MAX_PAGE_BYTES].decode(response.charset_encoding or 'utf-8', 'replace')
+            return response.status_code, html
+
     async def guess_contact_email(self, first_name: str, last_name: str, domain: str) -> list:
         """
         Generate common email patterns
         """
         fn = first_name.lower()
         ln = last_name.lower()
+        parts = {"fn": fn, "ln": ln, "fi": fn[:1], "li": ln[:1], "d": domain}
 
-        patterns = [
-            f"{fn}.{ln}@{domain}",
-            f"{fn}{ln}@{domain}",
-            f"{fn[0]}{ln}@{domain}",
-            f"{fn}@{domain}",
-            f"{fn}{ln[0]}@{domain}",
-            f"{fn[0]}.{ln}@{domain}",
-            f"{ln}.{fn}@{domain}",
-        ]
-
-        return patterns
+        return [template.format_map(parts) for template in EMAIL_TEMPLATES]
 
     async def discover_linkedin_profile(self, first_name: str, last_name: str, company_name: str) -> str:
         """
@@ -118,18 +175,21 @@ class FreeEnrichmentService:
 
         if company.domain:
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(f"https://{company.domain}", timeout=5.0)
-                    html = response.text
+                _, html = await self._fetch_page(f"https://{company.domain}", timeout=5.0)
+                html = html.lower()
 
-                    # Very rough heuristic
-                    if 'careers' in html.lower() or 'jobs' in html.lower():
-                        if 'enterprise' in html.lower():
-                            return "1000+"
-                        return "50-1000"
-                    return "1-50"
+                # Very rough heuristic
+                if 'careers' in html or 'jobs' in html:
+                    if 'enterprise' in html:
+                        return "1000+"
+                    return "50-1000"
+                return "1-50"
 
             except Exception:
                 pass
 
         return "Unknown"
+
+
+# Shared instance; holds the pooled HTTP client, closed on app shutdown
+free_enrichment_service = FreeEnrichmentService()
@@ -1,48 +1,139 @@
 """Job scraping service for Indeed and ZipRecruiter"""
+import asyncio
 import uuid
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional
 from datetime import datetime, timedelta
+from sqlalchemy import func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from app.schemas.lead import JobSearchRequest
-from app.models.lead import Company, JobPosting, Lead
+from app.models.lead import Company, JobPosting, Lead, LeadStatus
 from app.core.config import settings
 import httpx
 from loguru import logger
 
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+# Scraped jobs saved per INSERT round trip and commit
+SAVE_BATCH_SIZE = 1000
+
+# Mock postings returned when a source has no API key; _get_mock_jobs fills
+# in the per-search source, external_id, external_url and posted_date
+MOCK_JOB_TEMPLATES = (
+    {
+        "title": "Sales Development Representative",
+        "company_name": "TechCorp Solutions",
+        "company_domain": "techcorp.com",
+        "description": "We're seeking an energetic SDR to join our growing sales team...",
+        "location": "San Francisco, CA",
+        "city": "San Francisco",
+        "state": "CA",
+        "zip_code": "94102",
+        "salary_range": "$50k - $70k",
+        "employment_type": "full-time",
+        "is_remote": False,
+        "url_path": "/job/12345",
+        "age_days": 2
+    },
+    {
+        "title": "Business Development Manager",
+        "company_name": "Global Enterprises Inc",
+        "company_domain": "globalent.com",
+        "description": "Experienced BDM needed for enterprise sales...",
+        "location": "Remote",
+        "city": "Remote",
+        "state": "CA",
+        "zip_code": None,
+        "salary_range": "$80k - $120k",
+        "employment_type": "full-time",
+        "is_remote": True,
+        "url_path": "/job/67890",
+        "age_days": 5
+    },
+)
+
+# Lowercased title and description per template, for keyword filtering
+MOCK_JOB_SEARCH_TEXT = tuple(
+    f"{template['title']}\n{template['description']}".lower() for template in MOCK_JOB_TEMPLATES
+)
+
 
 class JobScraperService:
     """Service for scraping job postings from various sources"""
 
     def __init__(self, db: Session):
         self.db = db
+        # One pooled client for every source this search queries
+        self._client = httpx.AsyncClient(timeout=10.0, limits=HTTP_LIMITS)
 
-    def start_search(self, search_request: JobSearchRequest) -> str:
-        """Start a job search and return a task ID"""
-        task_id = str(uuid.uuid4())
-        # In production, this would create a Celery task
-        return task_id
+    async def aclose(self):
+        await self._client.aclose()
 
     async def execute_search(self, task_id: str, search_request: JobSearchRequest):
-        """Execute the job search"""
-        results = []
-
+        """Execute the job search, saving results in batches as they arrive"""
+        sources = []
         if search_request.search_indeed:
-            indeed_results = await self._search_indeed(search_request)
-            results.extend(indeed_results)
-
+            sources.append(self._search_indeed(search_request))
         if search_request.search_ziprecruiter:
-            ziprecruiter_results = await self._search_ziprecruiter(search_request)
-            results.extend(ziprecruiter_results)
+            sources.append(self._search_ziprecruiter(search_request))
 
-        # Save results to database
-        saved_count = await self._save_results(results)
+        saved_count = 0
+        batch = []
+        # Sources can repeat a job across pages or mirror each other's;
+        # skip repeats here rather than sending them to the database
+        seen_external_ids = set()
+        async for page in self._merge_pages(task_id, sources):
+            for job_data in page:
+                if job_data['external_id'] not in seen_external_ids:
+                    seen_external_ids.add(job_data['external_id'])
+                    batch.append(job_data)
+            while len(batch) >= SAVE_BATCH_SIZE:
+                saved_count += await self._save_results(batch[:SAVE_BATCH_SIZE])
+                batch = batch[SAVE_BATCH_SIZE:]
+
+        if batch:
+            saved_count += await self._save_results(batch)
 
         logger.info(f"Search {task_id} completed: {saved_count} jobs saved")
         return saved_count
 
-    async def _search_indeed(self, search_request: JobSearchRequest) -> List[Dict]:
+    async def _merge_pages(
+        self,
+        task_id: str,
+        sources: List[AsyncIterator[List[Dict]]]
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Yield result pages from all sources as each arrives
+        Sources are read concurrently; one failing doesn't lose the others
+        """
+        pages = asyncio.Queue(maxsize=len(sources))
+        finished = object()
+
+        async def read(source):
+            try:
+                async for page in source:
+                    await pages.put(page)
+            except Exception as e:
+                logger.error(f"Search {task_id} source failed: {e}")
+            finally:
+                await pages.put(finished)
+
+        readers = [asyncio.create_task(read(source)) for source in sources]
+        try:
+            remaining = len(readers)
+            while remaining:
+                page = await pages.get()
+                if page is finished:
+                    remaining -= 1
+                else:
+                    yield page
+        finally:
+            for reader in readers:
+                reader.cancel()
+
+    async def _search_indeed(self, search_request: JobSearchRequest) -> AsyncIterator[List[Dict]]:
         """
-        Search Indeed for job postings
+        Search Indeed for job postings, yielding a page of results at a time
         Note: This is a placeholder. In production, you would:
         1. Use Indeed's official API if available
         2. Use a web scraping service like ScraperAPI
@@ -52,152 +143,174 @@ class JobScraperService:
 
         if not settings.INDEED_API_KEY:
             logger.warning("Indeed API key not configured, using mock data")
-            return self._get_mock_jobs("indeed", search_request)
+            yield self._get_mock_jobs("indeed", search_request)
+            return
 
         # Placeholder for real API implementation
-        # async with httpx.AsyncClient() as client:
-        #     response = await client.get(
-        #         "https://api.indeed.com/ads/apisearch",
-        #         params={
-        #             "publisher": settings.INDEED_API_KEY,
-        #             "q": " ".join(search_request.keywords or []),
-        #             "l": search_request.zip_code,
-        #             "radius": search_request.radius_miles,
-        #         }
-        #     )
-        #     data = response.json()
-        #     return self._parse_indeed_results(data)
-
-        return self._get_mock_jobs("indeed", search_request)
-
-    async def _search_ziprecruiter(self, search_request: JobSearchRequest) -> List[Dict]:
+        # response = await self._client.get(
+        #     "https://api.indeed.com/ads/apisearch",
+        #     params={
+        #         "publisher": settings.INDEED_API_KEY,
+        #         "q": " ".join(search_request.keywords or []),
+        #         "l": search_request.zip_code,
+        #         "radius": search_request.radius_miles,
+        #     }
+        # )
+        # data = response.json()
+        # yield self._parse_indeed_results(data)
+
+        yield self._get_mock_jobs("indeed", search_request)
+
+    async def _search_ziprecruiter(self, search_request: JobSearchRequest) -> AsyncIterator[List[Dict]]:
         """
-        Search ZipRecruiter for job postings
+        Search ZipRecruiter for job postings, a page at a time
         Note: Similar to Indeed, this is a placeholder
         """
         logger.info("Searching ZipRecruiter...")
 
         if not settings.ZIPRECRUITER_API_KEY:
             logger.warning("ZipRecruiter API key not configured, using mock data")
-            return self._get_mock_jobs("ziprecruiter", search_request)
+            yield self._get_mock_jobs("ziprecruiter", search_request)
+            return
 
         # Placeholder for real API implementation
-        return self._get_mock_jobs("ziprecruiter", search_request)
+        yield self._get_mock_jobs("ziprecruiter", search_request)
 
     def _get_mock_jobs(self, source: str, search_request: JobSearchRequest) -> List[Dict]:
         """Generate mock job data for testing"""
-        mock_jobs = [
-            {
-                "title": "Sales Development Representative",
-                "company_name": "TechCorp Solutions",
-                "company_domain": "techcorp.com",
-                "description": "We're seeking an energetic SDR to join our growing sales team...",
-                "location": "San Francisco, CA",
-                "city": "San Francisco",
-                "state": "CA",
-                "zip_code": "94102",
-                "salary_range": "$50k - $70k",
-                "employment_type": "full-time",
-                "source": source,
-                "external_id": f"{source}_{uuid.uuid4()}",
-                "external_url": f"https://{source}.com/job/12345",
-                "posted_date": datetime.now() - timedelta(days=2),
-                "is_remote": False
-            },
-            {
-                "title": "Business Development Manager",
-                "company_name": "Global Enterprises Inc",
-                "company_domain": "globalent.com",
-                "description": "Experienced BDM needed for enterprise sales...",
-                "location": "Remote",
-                "city": "Remote",
-                "state": "CA",
-                "zip_code": None,
-                "salary_range": "$80k - $120k",
-                "employment_type": "full-time",
-                "source": source,
-                "external_id": f"{source}_{uuid.uuid4()}",
-                "external_url": f"https://{source}.com/job/67890",
-                "posted_date": datetime.now() - timedelta(days=5),
-                "is_remote": True
-            }
-        ]
+        templates = MOCK_JOB_TEMPLATES
 
         # Filter by keywords if provided
         if search_request.keywords:
             keywords_lower = [kw.lower() for kw in search_request.keywords]
-            mock_jobs = [
-                job for job in mock_jobs
-                if any(kw in job['title'].lower() or kw in job['description'].lower()
-                       for kw in keywords_lower)
+            templates = [
+                template for template, text in zip(MOCK_JOB_TEMPLATES, MOCK_JOB_SEARCH_TEXT)
+                if any(kw in text for kw in keywords_lower)
             ]
 
+        now = datetime.now()
+        mock_jobs = []
+        for template in templates:
+            job = dict(template)
+            age_days = job.pop('age_days')
+            job.update(
+                source=source,
+                external_id=f"{source}_{uuid.uuid4()}",
+                external_url=f"https://{source}.com{job.pop('url_path')}",
+                posted_date=now - timedelta(days=age_days)
+            )
+            mock_jobs.append(job)
+
         return mock_jobs
 
     async def _save_results(self, results: List[Dict]) -> int:
-        """Save job search results to database"""
-        saved_count = 0
-
+        """
+        Save job search results to database
+        One INSERT per table instead of several round trips per job; the
+        unique indexes skip jobs already saved, even by a concurrent search
+        """
+        # One entry per external_id, first result wins
+        jobs_by_external_id = {}
         for job_data in results:
-            try:
-                # Check if job already exists
-                existing = self.db.query(JobPosting).filter(
-                    JobPosting.external_id == job_data['external_id']
-                ).first()
-
-                if existing:
-                    logger.debug(f"Job {job_data['external_id']} already exists, skipping")
-                    continue
-
-                # Get or create company
-                company = self.db.query(Company).filter(
-                    Company.domain == job_data.get('company_domain')
-                ).first()
-
-                if not company:
-                    company = Company(
-                        name=job_data['company_name'],
-                        domain=job_data.get('company_domain'),
-                        city=job_data.get('city'),
-                        state=job_data.get('state'),
-                        zip_code=job_data.get('zip_code')
-                    )
-                    self.db.add(company)
-                    self.db.flush()
-
-                # Create job posting
-                job = JobPosting(
-                    company_id=company.id,
-                    title=job_data['title'],
-                    description=job_data.get('description'),
-                    location=job_data.get('location'),
-                    city=job_data.get('city'),
-                    state=job_data.get('state'),
-                    zip_code=job_data.get('zip_code'),
-                    salary_range=job_data.get('salary_range'),
-                    employment_type=job_data.get('employment_type'),
-                    source=job_data['source'],
-                    external_id=job_data['external_id'],
-                    external_url=job_data.get('external_url'),
-                    posted_date=job_data.get('posted_date'),
-                    is_remote=job_data.get('is_remote', False)
-                )
-                self.db.add(job)
-                self.db.flush()
-
-                # Create lead
-                lead = Lead(
-                    company_id=company.id,
-                    job_posting_id=job.id,
-                    status='new'
-                )
-                self.db.add(lead)
-
-                saved_count += 1
+            jobs_by_external_id.setdefault(job_data['external_id'], job_data)
 
-            except Exception as e:
-                logger.error(f"Error saving job: {e}")
-                continue
+        if not jobs_by_external_id:
+            return 0
+
+        jobs = list(jobs_by_external_id.values())
+        company_ids = self._upsert_companies(jobs)
+
+        # Job postings, as one multi-row INSERT; RETURNING only includes the
+        # ones actually inserted
+        result = self.db.execute(
+            pg_insert(JobPosting).values([
+                {
+                    'company_id': company_id,
+                    'title': job_data['title'],
+                    'description': job_data.get('description'),
+                    'location': job_data.get('location'),
+                    'city': job_data.get('city'),
+                    'state': job_data.get('state'),
+                    'zip_code': job_data.get('zip_code'),
+                    'salary_range': job_data.get('salary_range'),
+                    'employment_type': job_data.get('employment_type'),
+                    'source': job_data['source'],
+                    'external_id': job_data['external_id'],
+                    'external_url': job_data.get('external_url'),
+                    'posted_date': job_data.get('posted_date'),
+                    'is_remote': job_data.get('is_remote', False)
+                }
+                for job_data, company_id in zip(jobs, company_ids)
+            ]).on_conflict_do_nothing(
+                index_elements=['external_id']
+            ).returning(JobPosting.external_id, JobPosting.id)
+        )
+        job_ids = dict(result.all())
+
+        # One new lead per saved job
+        leads = [
+            {
+                'company_id': company_id,
+                'job_posting_id': job_ids[job_data['external_id']],
+                'status': LeadStatus.NEW
+            }
+            for job_data, company_id in zip(jobs, company_ids)
+            if job_data['external_id'] in job_ids
+        ]
+        if leads:
+            self.db.execute(insert(Lead), leads)
 
         self.db.commit()
-        return saved_count
+        return len(leads)
+
+    def _upsert_companies(self, jobs: List[Dict]) -> List[int]:
+        """
+        Company id for each job, getting or creating companies in bulk
+        Jobs share a company by lowercase domain, upserted in one multi-row
+        statement; as in the CSV import, the no-op update on conflict makes
+        RETURNING include existing companies. A job without a domain gets
+        its own company
+        """
+        def new_company(job_data: Dict) -> Dict:
+            return {
+                'name': job_data['company_name'],
+                'domain': job_data.get('company_domain'),
+                'city': job_data.get('city'),
+                'state': job_data.get('state'),
+                'zip_code': job_data.get('zip_code')
+            }
+
+        # One company per lowercase domain, first job wins
+        domains = [(job_data.get('company_domain') or '').lower() for job_data in jobs]
+        by_domain = {}
+        without_domain = []
+        for domain, job_data in zip(domains, jobs):
+            if domain:
+                by_domain.setdefault(domain, new_company(job_data))
+            else:
+                without_domain.append(new_company(job_data))
+
+        company_ids = {}
+        if by_domain:
+            # A single INSERT ... VALUES (...), (...); RETURNING order isn't
+            # guaranteed here, so ids map back by domain
+            stmt = pg_insert(Company).values(list(by_domain.values()))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[func.lower(Company.domain)],
+                set_={'domain': stmt.excluded.domain}
+            ).returning(Company.domain, Company.id)
+
+            company_ids = {domain.lower(): company_id for domain, company_id in self.db.execute(stmt)}
+
+        unnamed_ids = iter(())
+        if without_domain:
+            # Plain executemany, batched by insertmanyvalues in input order.
+            # Run on the session's connection: the ORM's bulk INSERT drops
+            # None values and splits rows into one batch per set of keys
+            result = self.db.connection().execute(
+                insert(Company).returning(Company.id, sort_by_parameter_order=True),
+                without_domain
+            )
+            unnamed_ids = iter(result.scalars().all())
+
+        return [company_ids[domain] if domain else next(unnamed_ids) for domain in domains]
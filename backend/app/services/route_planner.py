@@ -1,19 +1,51 @@
 """Route planning and optimization service"""
+import asyncio
+import hashlib
 from typing import List, Optional, Dict, Tuple
+from urllib.parse import urlencode
 from app.models.lead import Lead
 from app.schemas.lead import RoutePlanResponse, RouteStop
+from app.core import cache
 from app.core.config import settings
-from geopy.distance import geodesic
-from geopy.geocoders import Nominatim
 import httpx
 from loguru import logger
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.8
+GEOCODE_INTERVAL_SECONDS = 1.0
+
+# Routes with fewer points than this are optimized without NumPy
+SCALAR_ROUTE_MAX_POINTS = 128
+
+
+def haversine_miles(lat, lon, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle miles between points in radians, broadcasting like NumPy"""
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+
+
+def geocode_cache_key(address: str) -> str:
+    """Cache key for an address, ignoring case and whitespace differences"""
+    normalized = " ".join(address.lower().split())
+    return f"geo:{hashlib.sha1(normalized.encode()).hexdigest()}"
+
+
+def distance_matrix(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Symmetric N x N great-circle miles between points given in radians"""
+    return haversine_miles(lats[:, None], lons[:, None], lats, lons)
 
 
 class RoutePlannerService:
     """Service for planning optimized visit routes"""
 
     def __init__(self):
-        self.geocoder = Nominatim(user_agent="leadgen_app")
+        # One pooled client; Nominatim requires an identifying User-Agent
+        self._client = httpx.AsyncClient(timeout=10.0, headers={"User-Agent": "leadgen_app"})
+        # Each slot covers one request per GEOCODE_INTERVAL_SECONDS
+        self._geocode_slots = asyncio.Semaphore(settings.GEOCODE_CONCURRENCY)
+
+    async def aclose(self):
+        await self._client.aclose()
 
     async def plan_route(
         self,
@@ -48,23 +80,36 @@ class RoutePlannerService:
         if start_location:
             start_coords = await self._geocode_address(start_location)
 
+        # Great-circle miles between every pair of stops, computed once and
+        # shared by the optimizer and the per-leg distances; a start
+        # location is an extra point after the stops
+        points = [stop['coords'] for stop in stops]
+        start = None
+        if start_coords:
+            points.append(start_coords)
+            start = len(stops)
+
+        lats, lons = np.radians(np.array(points, dtype=np.float64)).T
+        distances = distance_matrix(lats, lons)
+
         # Optimize route order
         if optimize:
-            ordered_stops = self._optimize_route(stops, start_coords)
+            order = self._optimize_route(distances, start)
         else:
-            ordered_stops = stops
+            order = list(range(len(stops)))
+        ordered_stops = [stops[stop_idx] for stop_idx in order]
 
         # Calculate distances and build response
         route_stops = []
         total_distance = 0.0
-        previous_coords = start_coords or ordered_stops[0]['coords']
+        previous = order[0] if start is None else start
 
-        for idx, stop in enumerate(ordered_stops):
+        for idx, (stop_idx, stop) in enumerate(zip(order, ordered_stops)):
             lead = stop['lead']
             company = lead.company
 
-            # Calculate distance from previous stop
-            distance = geodesic(previous_coords, stop['coords']).miles
+            # Distance from previous stop
+            distance = float(distances[previous, stop_idx])
             total_distance += distance
 
             route_stop = RouteStop(
@@ -76,7 +121,7 @@ class RoutePlannerService:
             )
             route_stops.append(route_stop)
 
-            previous_coords = stop['coords']
+            previous = stop_idx
 
         # Estimate duration (assuming 30 mph average + 30 min per stop)
         estimated_duration = int((total_distance / 30) * 60) + (len(stops) * 30)
@@ -94,35 +139,54 @@ class RoutePlannerService:
         )
 
     async def _geocode_companies(self, leads: List[Lead]):
-        """Geocode company addresses that don't have coordinates"""
+        """Geocode company addresses that don't have coordinates, concurrently"""
+        # Companies by address, so each distinct address is geocoded once
+        by_address = {}
         for lead in leads:
             company = lead.company
 
-            # Skip if already geocoded
+            # Skip if already geocoded, or no address to geocode
             if company.latitude and company.longitude:
                 continue
-
-            # Build address string
             if not company.address or not company.city:
                 continue
 
             address = f"{company.address}, {company.city}, {company.state} {company.zip_code}"
+            by_address.setdefault(address, {})[company.id] = company
 
-            try:
-                coords = await self._geocode_address(address)
-                if coords:
-                    company.latitude, company.longitude = coords
-                    logger.info(f"Geocoded {company.name}: {coords}")
+        addresses = list(by_address)
+        results = await asyncio.gather(*(self._geocode_address(address) for address in addresses))
 
-            except Exception as e:
-                logger.error(f"Error geocoding {company.name}: {e}")
+        for address, coords in zip(addresses, results):
+            if not coords:
+                continue
+            for company in by_address[address].values():
+                company.latitude, company.longitude = coords
+                logger.info(f"Geocoded {company.name}: {coords}")
 
     async def _geocode_address(self, address: str) -> Optional[Tuple[float, float]]:
-        """Geocode an address to coordinates"""
+        """Geocode an address to coordinates with Nominatim's search API, cached"""
+        cache_key = geocode_cache_key(address)
+        cached = await cache.get_json(cache_key)
+        if cached:
+            return tuple(cached)
+
+        # The slot frees up GEOCODE_INTERVAL_SECONDS after the request starts,
+        # which paces requests without delaying this caller
+        await self._geocode_slots.acquire()
+        asyncio.get_running_loop().call_later(GEOCODE_INTERVAL_SECONDS, self._geocode_slots.release)
+
         try:
-            location = self.geocoder.geocode(address, timeout=10)
-            if location:
-                return (location.latitude, location.longitude)
+            response = await self._client.get(
+                settings.NOMINATIM_URL,
+                params={"q": address, "format": "json", "limit": 1}
+            )
+            response.raise_for_status()
+            results = response.json()
+            if results:
+                coords = (float(results[0]["lat"]), float(results[0]["lon"]))
+                await cache.set_json(cache_key, coords, settings.GEOCODE_CACHE_TTL_SECONDS)
+                return coords
         except Exception as e:
             logger.error(f"Error geocoding address {address}: {e}")
 
@@ -130,63 +194,110 @@ class RoutePlannerService:
 
     def _optimize_route(
         self,
-        stops: List[Dict],
-        start_coords: Optional[Tuple[float, float]] = None
-    ) -> List[Dict]:
+        distances: np.ndarray,
+        start: Optional[int] = None
+    ) -> List[int]:
         """
-        Optimize route using nearest neighbor algorithm
+        Optimize route using nearest neighbor, then 2-opt improvement
+        Takes the distance matrix and the start location's index in it, if
+        any, and returns stop indices in visiting order
         For production, consider using:
         - Google Maps Directions API with waypoint optimization
         - OSRM (Open Source Routing Machine)
         - GraphHopper
         - OR-Tools for more complex optimization
         """
-        if not stops:
-            return []
+        # Start from the start location, or the first stop
+        current = 0 if start is None else start
 
-        # Simple nearest neighbor algorithm
-        ordered = []
-        remaining = stops.copy()
+        # NumPy's per-call overhead outweighs its vector speed on small
+        # routes, which are most of them; plain lists are faster there
+        if len(distances) < SCALAR_ROUTE_MAX_POINTS:
+            tour = self._optimize_small_route(distances.tolist(), current)
+            return tour if start is None else tour[1:]
 
-        # Start from specified location or first stop
-        current_coords = start_coords or remaining[0]['coords']
+        # Visited points are masked out rather than removed
+        remaining = np.ones(len(distances), dtype=bool)
+        remaining[current] = False
+        order = [current]
 
-        # If we have a start location that's not in the stops, use it
-        if start_coords and start_coords != remaining[0]['coords']:
-            # Find nearest to start
-            nearest_idx = self._find_nearest(current_coords, remaining)
-            current_stop = remaining.pop(nearest_idx)
-        else:
-            current_stop = remaining.pop(0)
+        # Greedily select nearest remaining stop
+        for _ in range(len(distances) - 1):
+            current = self._find_nearest(current, remaining, distances)
+            order.append(current)
+            remaining[current] = False
 
-        ordered.append(current_stop)
-        current_coords = current_stop['coords']
+        # 2-opt over the greedy tour, keeping its first point fixed
+        tour = self._two_opt(order, distances)
 
-        # Greedily select nearest remaining stop
+        return tour if start is None else tour[1:]
+
+    def _optimize_small_route(self, distances: List[List[float]], current: int) -> List[int]:
+        """Nearest neighbor then 2-opt, as below, in plain Python for small routes"""
+        remaining = [idx for idx in range(len(distances)) if idx != current]
+        tour = [current]
+
+        # Greedily select nearest remaining stop (lowest index on ties, as argmin)
         while remaining:
-            nearest_idx = self._find_nearest(current_coords, remaining)
-            current_stop = remaining.pop(nearest_idx)
-            ordered.append(current_stop)
-            current_coords = current_stop['coords']
+            current = min(remaining, key=distances[current].__getitem__)
+            remaining.remove(current)
+            tour.append(current)
+
+        # 2-opt, taking the first best reversal for each segment start
+        improved = True
+        while improved:
+            improved = False
+            for i in range(1, len(tour) - 1):
+                before, first = tour[i - 1], tour[i]
+                before_first = distances[before][first]
+                best_gain, best_end = 1e-9, None
+
+                for j in range(i + 1, len(tour)):
+                    last = tour[j]
+                    if j + 1 < len(tour):
+                        after = tour[j + 1]
+                        gain = (before_first + distances[last][after]) - (distances[before][last] + distances[first][after])
+                    else:
+                        gain = before_first - distances[before][last]
+                    if gain > best_gain:
+                        best_gain, best_end = gain, j
+
+                if best_end is not None:
+                    tour[i:best_end + 1] = tour[i:best_end + 1][::-1]
+                    improved = True
+
+        return tour
+
+    def _find_nearest(self, current: int, mask: np.ndarray, distances: np.ndarray) -> int:
+        """Find index of nearest unmasked point to the current one"""
+        return int(np.where(mask, distances[current], np.inf).argmin())
+
+    def _two_opt(self, order: List[int], distances: np.ndarray) -> List[int]:
+        """
+        Shorten an open tour by reversing segments until no reversal helps
+        order[0] stays fixed and the end is free; each pass scores every
+        segment end for a given segment start in one NumPy expression
+        """
+        tour = np.array(order)
+        improved = True
 
-        return ordered
+        while improved:
+            improved = False
+            for i in range(1, len(tour) - 1):
+                before, first = tour[i - 1], tour[i]
+                # Candidate segment ends tour[i+1:], and the stop after each
+                lasts, afters = tour[i + 1:], tour[i + 2:]
 
-    def _find_nearest(
-        self,
-        coords: Tuple[float, float],
-        stops: List[Dict]
-    ) -> int:
-        """Find index of nearest stop to given coordinates"""
-        min_distance = float('inf')
-        nearest_idx = 0
+                removed = distances[before, first] + np.append(distances[lasts[:-1], afters], 0.0)
+                added = distances[before, lasts] + np.append(distances[first, afters], 0.0)
+                gains = removed - added
 
-        for idx, stop in enumerate(stops):
-            distance = geodesic(coords, stop['coords']).miles
-            if distance < min_distance:
-                min_distance = distance
-                nearest_idx = idx
+                best = int(gains.argmax())
+                if gains[best] > 1e-9:
+                    tour[i:i + best + 2] = tour[i:i + best + 2][::-1]
+                    improved = True
 
-        return nearest_idx
+        return tour.tolist()
 
     def _generate_map_url(
         self,
@@ -196,21 +307,19 @@ class RoutePlannerService:
         """
         Generate a Google Maps URL with all waypoints
         """
-        # Build waypoints string
-        waypoints = []
-        for stop in stops:
-            company = stop['lead'].company
-            waypoints.append(f"{company.city}, {company.state}")
+        waypoints = [f"{company.city}, {company.state}" for company in (stop['lead'].company for stop in stops)]
 
-        origin = start_location or waypoints[0]
-        destination = waypoints[-1]
-        waypoints_str = "|".join(waypoints[:-1])
+        params = {
+            "api": "1",
+            "origin": start_location or waypoints[0],
+            "destination": waypoints[-1]
+        }
+        if len(waypoints) > 1:
+            params["waypoints"] = "|".join(waypoints[:-1])
 
-        # Google Maps URL format
-        base_url = "https://www.google.com/maps/dir/"
-        url = f"{base_url}?api=1&origin={origin}&destination={destination}"
+        # Google Maps URL format; names contain spaces and commas, so encode them
+        return "https://www.google.com/maps/dir/?" + urlencode(params, safe="|,")
 
-        if waypoints_str:
-            url += f"&waypoints={waypoints_str}"
 
-        return url
+# Shared instance; holds the pooled geocoding client and rate limit
+route_planner = RoutePlannerService()
@@ -0,0 +1,53 @@
+"""Celery tasks"""
+import asyncio
+from app.celery_app import celery_app
+from app.core import cache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.schemas.lead import JobSearchRequest
+from app.services.job_scraper import JobScraperService
+
+
+def search_status_key(task_id: str) -> str:
+    return f"search:{task_id}:status"
+
+
+def _report_search_status(task_id: str, status: str, results_count: int = 0):
+    """Publish a search's status for get_search_status to read without Celery"""
+    cache.set_json_sync(search_status_key(task_id), {
+        "task_id": task_id,
+        "status": status,
+        "results_count": results_count
+    }, settings.SEARCH_STATUS_TTL_SECONDS)
+
+
+async def _run_search(db, task_id: str, search_request: JobSearchRequest) -> int:
+    """Run one search, closing the scraper's HTTP client inside the same event loop"""
+    scraper = JobScraperService(db)
+    try:
+        return await scraper.execute_search(task_id, search_request)
+    finally:
+        await scraper.aclose()
+
+
+@celery_app.task(bind=True, name="scraper.execute_search")
+def execute_search_task(self, search_request: dict) -> int:
+    """Run a job search on a worker and return the number of jobs saved"""
+    task_id = self.request.id
+    _report_search_status(task_id, "processing")
+
+    db = SessionLocal()
+    try:
+        saved_count = asyncio.run(
+            _run_search(db, task_id, JobSearchRequest(**search_request))
+        )
+    except Exception:
+        _report_search_status(task_id, "failed")
+        raise
+    finally:
+        db.close()
+
+    # Saved jobs come with new leads
+    cache.bump_generation_sync(cache.LEADS)
+    _report_search_status(task_id, "completed", saved_count)
+    return saved_count
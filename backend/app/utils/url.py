@@ -0,0 +1,16 @@
+"""URL helpers"""
+from functools import lru_cache
+from urllib.parse import urlparse
+
+
+@lru_cache(maxsize=4096)
+def extract_domain(url: str) -> str:
+    """
+    Normalize a website or URL to a bare lowercase domain
+    Handles missing schemes, ports, paths and a leading www.
+    """
+    if not url:
+        return ''
+
+    parsed = urlparse(url.strip() if '://' in url else f"http://{url.strip()}")
+    return (parsed.hostname or '').removeprefix('www.')
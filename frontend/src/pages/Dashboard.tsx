@@ -1,7 +1,7 @@
 import { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
 import { leadsApi, integrationsApi } from '../services/api';
-import type { Lead, IntegrationsStatus } from '../types';
+import type { LeadListItem, IntegrationsStatus } from '../types';
 import {
   UserGroupIcon,
   BuildingOfficeIcon,
@@ -12,7 +12,7 @@ import {
 } from '@heroicons/react/24/outline';
 
 export default function Dashboard() {
-  const [leads, setLeads] = useState<Lead[]>([]);
+  const [leads, setLeads] = useState<LeadListItem[]>([]);
   const [integrations, setIntegrations] = useState<IntegrationsStatus | null>(null);
   const [loading, setLoading] = useState(true);
 
@@ -177,16 +177,16 @@ export default function Dashboard() {
                 <div className="flex justify-between items-start">
                   <div>
                     <h3 className="font-semibold text-gray-900">
-                      {lead.company?.name || 'Unknown Company'}
+                      {lead.company_name || 'Unknown Company'}
                     </h3>
-                    {lead.job_posting && (
+                    {lead.job_title && (
                       <p className="text-sm text-gray-600 mt-1">
-                        {lead.job_posting.title}
+                        {lead.job_title}
                       </p>
                     )}
-                    {lead.contact && (
+                    {lead.contact_full_name && (
                       <p className="text-sm text-gray-500 mt-1">
-                        Contact: {lead.contact.full_name}
+                        Contact: {lead.contact_full_name}
                       </p>
                     )}
                   </div>
@@ -1,7 +1,7 @@
 import { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
 import { leadsApi, contentApi, routesApi } from '../services/api';
-import type { Lead } from '../types';
+import type { LeadListItem } from '../types';
 import { toast } from 'react-toastify';
 import {
   PhoneIcon,
@@ -11,7 +11,7 @@ import {
 } from '@heroicons/react/24/outline';
 
 export default function LeadsList() {
-  const [leads, setLeads] = useState<Lead[]>([]);
+  const [leads, setLeads] = useState<LeadListItem[]>([]);
   const [selectedLeads, setSelectedLeads] = useState<Set<number>>(new Set());
   const [filterStatus, setFilterStatus] = useState<string>('all');
   const [loading, setLoading] = useState(true);
@@ -225,23 +225,23 @@ export default function LeadsList() {
                     <td className="px-6 py-4">
                       <div>
                         <div className="font-medium text-gray-900">
-                          {lead.company?.name || 'Unknown'}
+                          {lead.company_name || 'Unknown'}
                         </div>
-                        {lead.company?.city && lead.company?.state && (
+                        {lead.company_city && lead.company_state && (
                           <div className="text-sm text-gray-500">
-                            {lead.company.city}, {lead.company.state}
+                            {lead.company_city}, {lead.company_state}
                           </div>
                         )}
                       </div>
                     </td>
                     <td className="px-6 py-4">
-                      {lead.contact ? (
+                      {lead.contact_id ? (
                         <div>
                           <div className="text-sm text-gray-900">
-                            {lead.contact.full_name}
+                            {lead.contact_full_name}
                           </div>
                           <div className="text-sm text-gray-500">
-                            {lead.contact.title || lead.contact.email}
+                            {lead.contact_title || lead.contact_email}
                           </div>
                         </div>
                       ) : (
@@ -249,9 +249,9 @@ export default function LeadsList() {
                       )}
                     </td>
                     <td className="px-6 py-4">
-                      {lead.job_posting ? (
+                      {lead.job_posting_id ? (
                         <div className="text-sm text-gray-900">
-                          {lead.job_posting.title}
+                          {lead.job_title}
                         </div>
                       ) : (
                         <span className="text-sm text-gray-400">No job</span>
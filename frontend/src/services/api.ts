@@ -1,7 +1,7 @@
 // API service for backend communication
 import axios from 'axios';
 import type {
-  Lead, Company, Contact, JobPosting, SearchCriteria,
+  Lead, LeadListItem, Company, Contact, ContactSummary, JobPosting, JobPostingSummary, SearchCriteria,
   LeadActivity, RoutePlan, IntegrationsStatus
 } from '../types';
 
@@ -17,7 +17,7 @@ const api = axios.create({
 // Leads API
 export const leadsApi = {
   getAll: (params?: { skip?: number; limit?: number; status?: string }) =>
-    api.get<Lead[]>('/api/leads', { params }),
+    api.get<LeadListItem[]>('/api/leads', { params }),
 
   getOne: (id: number) =>
     api.get<Lead>(`/api/leads/${id}`),
@@ -59,7 +59,7 @@ export const companiesApi = {
 // Contacts API
 export const contactsApi = {
   getAll: (params?: { skip?: number; limit?: number; company_id?: number }) =>
-    api.get<Contact[]>('/api/contacts', { params }),
+    api.get<ContactSummary[]>('/api/contacts', { params }),
 
   getOne: (id: number) =>
     api.get<Contact>(`/api/contacts/${id}`),
@@ -77,7 +77,7 @@ export const contactsApi = {
 // Jobs API
 export const jobsApi = {
   getAll: (params?: any) =>
-    api.get<JobPosting[]>('/api/jobs', { params }),
+    api.get<JobPostingSummary[]>('/api/jobs', { params }),
 
   getOne: (id: number) =>
     api.get<JobPosting>(`/api/jobs/${id}`),
@@ -39,6 +39,11 @@ export interface Contact {
   created_at: string;
 }
 
+export type ContactSummary = Pick<
+  Contact,
+  'id' | 'company_id' | 'first_name' | 'last_name' | 'full_name' | 'title' | 'email' | 'phone'
+>;
+
 export interface JobPosting {
   id: number;
   company_id: number;
@@ -58,6 +63,8 @@ export interface JobPosting {
   created_at: string;
 }
 
+export type JobPostingSummary = Omit<JobPosting, 'description' | 'requirements' | 'external_id'>;
+
 export type LeadStatus = 'new' | 'in_progress' | 'contacted' | 'qualified' | 'converted' | 'closed_lost';
 export type ContactMethod = 'call' | 'visit' | 'email';
 
@@ -81,6 +88,23 @@ export interface Lead {
   job_posting?: JobPosting;
 }
 
+export interface LeadListItem {
+  id: number;
+  company_id: number;
+  contact_id?: number;
+  job_posting_id?: number;
+  status: LeadStatus;
+  score?: number;
+  created_at: string;
+  company_name: string;
+  company_city?: string;
+  company_state?: string;
+  contact_full_name?: string;
+  contact_title?: string;
+  contact_email?: string;
+  job_title?: string;
+}
+
 export interface LeadActivity {
   id: number;
   lead_id: number;